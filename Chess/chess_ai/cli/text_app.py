@@ -11,7 +11,7 @@ from chess_ai.engine.sunfish_wrapper import SunfishWrapper, EngineInitialization
 from chess_ai.engine.fallback_engine import FallbackEngine
 from chess_ai.cli.text_interface import TextInterface
 from chess_ai.config.settings import Colors
-from chess_ai.utils.helpers import check_game_over
+from chess_ai.utils.helpers import check_game_over, GameResult
 
 class TextChessApp:
     """Text-based chess application class."""
@@ -136,9 +136,9 @@ class TextChessApp:
                 # Check if game is over
                 is_over, result = check_game_over(self.board)
                 if is_over:
-                    if result == "1-0":
+                    if result == GameResult.WHITE_WIN:
                         print(f"{Colors.GREEN}White wins!{Colors.RESET}")
-                    elif result == "0-1":
+                    elif result == GameResult.BLACK_WIN:
                         print(f"{Colors.RED}Black wins!{Colors.RESET}")
                     else:
                         print(f"{Colors.YELLOW}Game drawn!{Colors.RESET}")
@@ -204,11 +204,13 @@ class PositionalEvaluator:
             The material balance in centipawns from white's perspective
         """
         score = 0
+        popcount = chess.popcount
+        pieces_mask = board.pieces_mask
         
-        # Count material for each piece type
+        # Count material for each piece type with popcounts on the bitboards
         for piece_type in chess.PIECE_TYPES:
-            score += len(board.pieces(piece_type, chess.WHITE)) * self.PIECE_VALUES[piece_type]
-            score -= len(board.pieces(piece_type, chess.BLACK)) * self.PIECE_VALUES[piece_type]
+            count = popcount(pieces_mask(piece_type, chess.WHITE)) - popcount(pieces_mask(piece_type, chess.BLACK))
+            score += count * self.PIECE_VALUES[piece_type]
         
         return score
     
@@ -532,18 +534,17 @@ class PositionalEvaluator:
             True if the position is an endgame, False otherwise
         """
         # Count the number of non-pawn pieces for each side
-        white_pieces = 0
-        black_pieces = 0
-        
-        for piece_type in [chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN]:
-            white_pieces += len(board.pieces(piece_type, chess.WHITE))
-            black_pieces += len(board.pieces(piece_type, chess.BLACK))
+        white = board.occupied_co[chess.WHITE]
+        black = board.occupied_co[chess.BLACK]
+        minors_and_majors = board.knights | board.bishops | board.rooks | board.queens
+        white_pieces = chess.popcount(minors_and_majors & white)
+        black_pieces = chess.popcount(minors_and_majors & black)
         
         # Consider it an endgame if both sides have <= 3 non-pawn pieces
         # or if one side has a queen and no other pieces
         return (white_pieces <= 3 and black_pieces <= 3) or \
-               (white_pieces == 1 and len(board.pieces(chess.QUEEN, chess.WHITE)) == 1) or \
-               (black_pieces == 1 and len(board.pieces(chess.QUEEN, chess.BLACK)) == 1)
+               (white_pieces == 1 and board.queens & white != 0) or \
+               (black_pieces == 1 and board.queens & black != 0)
     
     def count_piece_mobility(self, board):
         """
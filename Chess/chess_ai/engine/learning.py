@@ -109,18 +109,29 @@ class LearningSystem:
         # Just keep the piece positions part of the FEN
         return fen.split(' ')[0]
     
-    def record_position(self, board, evaluation):
+    def _position_key(self, board):
         """
-        Record a position and its evaluation during a game.
+        Get the key of a board's position in the learning data.
+        
+        This is simplify_fen(board.fen()), without generating the full FEN.
         
         Args:
             board: A chess.Board object
-            evaluation: The evaluation score for the position
+            
+        Returns:
+            The simplified FEN of the position
         """
-        # Simplify the FEN to focus on piece positions
-        simple_fen = self.simplify_fen(board.fen())
+        return board.board_fen()
+    
+    def _record_position_for_key(self, simple_fen, board, evaluation):
+        """
+        Store a position and its evaluation for later learning.
         
-        # Store the position and evaluation for later learning
+        Args:
+            simple_fen: The simplified FEN of the position (see _position_key)
+            board: A chess.Board object
+            evaluation: The evaluation score for the position
+        """
         self.game_positions.append({
             'fen': simple_fen,
             'eval': evaluation,
@@ -128,6 +139,34 @@ class LearningSystem:
             'side_to_move': 'w' if board.turn == chess.WHITE else 'b'
         })
     
+    def record_position(self, board, evaluation):
+        """
+        Record a position and its evaluation during a game.
+        
+        Args:
+            board: A chess.Board object
+            evaluation: The evaluation score for the position
+        """
+        self._record_position_for_key(self._position_key(board), board, evaluation)
+    
+    def record_and_adjust(self, board, evaluation):
+        """
+        Record a position and return its evaluation adjusted by learning data.
+        
+        Equivalent to record_position followed by adjust_evaluation, but the
+        simplified position key is only computed once.
+        
+        Args:
+            board: A chess.Board object
+            evaluation: The evaluation score for the position
+            
+        Returns:
+            An adjusted evaluation score
+        """
+        simple_fen = self._position_key(board)
+        self._record_position_for_key(simple_fen, board, evaluation)
+        return self._adjust_evaluation_for_key(simple_fen, board.turn, evaluation)
+    
     def record_game_result(self, result):
         """
         Record the result of a game.
@@ -198,11 +237,23 @@ class LearningSystem:
             A tuple (has_data, evaluation) where has_data is a boolean
             indicating if we have data for this position
         """
-        simple_fen = self.simplify_fen(board.fen())
+        return self._learned_evaluation_for_key(self._position_key(board), board.turn)
+    
+    def _learned_evaluation_for_key(self, simple_fen, turn):
+        """
+        Get the learned evaluation for a simplified position key.
+        
+        Args:
+            simple_fen: The simplified FEN of the position
+            turn: The side to move
+            
+        Returns:
+            A tuple (has_data, evaluation) as returned by get_learned_evaluation
+        """
+        data = self.position_data.get(simple_fen)
         
-        if simple_fen in self.position_data:
+        if data is not None:
             self.cache_hits += 1
-            data = self.position_data[simple_fen]
             
             # Calculate win rate for this position
             win_rate = data['result_sum'] / data['count'] if data['count'] > 0 else 0.5
@@ -212,7 +263,7 @@ class LearningSystem:
             blended_eval = (1 - confidence) * data['eval'] + confidence * self._win_rate_to_eval(win_rate)
             
             # Adjust for side to move
-            if not board.turn == chess.WHITE:
+            if not turn == chess.WHITE:
                 blended_eval = -blended_eval
                 
             return True, blended_eval
@@ -230,12 +281,25 @@ class LearningSystem:
         Returns:
             An adjusted evaluation score
         """
-        has_data, learned_eval = self.get_learned_evaluation(board)
+        return self._adjust_evaluation_for_key(self._position_key(board), board.turn, base_eval)
+    
+    def _adjust_evaluation_for_key(self, simple_fen, turn, base_eval):
+        """
+        Adjust an evaluation based on learning data for a simplified position key.
+        
+        Args:
+            simple_fen: The simplified FEN of the position
+            turn: The side to move
+            base_eval: The base evaluation from the engine
+            
+        Returns:
+            An adjusted evaluation score
+        """
+        has_data, learned_eval = self._learned_evaluation_for_key(simple_fen, turn)
         
         if has_data:
             # Blend the base evaluation with the learned evaluation
             # Weight depends on how many times we've seen this position
-            simple_fen = self.simplify_fen(board.fen())
             count = self.position_data[simple_fen]['count']
             
             # Calculate weight based on count (max 0.5)
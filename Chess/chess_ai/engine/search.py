@@ -7,6 +7,125 @@ import chess
 import time
 from chess_ai.engine.transposition_table import TranspositionTable
 
+# Maximum search ply tracked by the killer move table
+MAX_PLY = 64
+
+# Score of a checkmate in centipawns. Scores are kept as integers during the
+# search and this value also serves as the infinite bound of the root window.
+MATE = 1000000
+
+# Scores at least this close to MATE are mates, which the search scores by
+# their distance from the root. No mate is found further than MAX_PLY away.
+MATE_THRESHOLD = MATE - 2 * MAX_PLY
+
+# Piece values for MVV-LVA move ordering, indexed by piece type (index 0 is
+# an empty square)
+PIECE_VALUES = (0, 10, 30, 30, 50, 90, 900)
+
+# Half-width of the aspiration window around the previous iteration's score,
+# in centipawns, and the first depth at which it is used
+ASPIRATION_WINDOW = 50
+ASPIRATION_MIN_DEPTH = 3
+
+# Delta pruning margin for quiescence search, in centipawns: captures that
+# cannot raise the score to alpha even with this much extra are skipped
+DELTA_MARGIN = 200
+
+# The clock is only read on every 4096th time check, since time.time() is
+# comparatively expensive and a search visits many nodes between checks
+TIME_CHECK_MASK = 0xFFF
+
+# Late move reductions: moves after the first LMR_MIN_MOVE_INDEX moves at
+# nodes with at least LMR_MIN_DEPTH remaining plies are searched shallower
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVE_INDEX = 3
+
+# Transposition table bound flags
+TT_EXACT = 0  # Score is the exact value of the position
+TT_LOWER = 1  # Search failed high; the true value is at least the score
+TT_UPPER = 2  # Search failed low; the true value is at most the score
+
+# Move ordering bonus for the best move stored in the transposition table
+TT_MOVE_BONUS = 10000000
+
+# Move ordering bonus for killer moves (quiet moves that caused a beta cutoff)
+KILLER_MOVE_BONUS = 9000
+
+def pack_tt_data(score, move, flag):
+    """
+    Pack a search result into a single integer for the transposition table.
+
+    The move takes the low 15 bits (from square, to square and promotion
+    piece), the bound flag the next 2 bits and the score the remaining bits,
+    which is far smaller than a dict per entry.
+
+    Args:
+        score: The score in centipawns
+        move: The best move, or None
+        flag: One of TT_EXACT, TT_LOWER or TT_UPPER
+
+    Returns:
+        The packed integer
+    """
+    move_code = 0
+    if move:
+        move_code = move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+    return score << 17 | flag << 15 | move_code
+
+def unpack_tt_data(data):
+    """
+    Unpack an integer created by pack_tt_data.
+
+    Args:
+        data: The packed integer
+
+    Returns:
+        A tuple (score, move, flag), where move is None if no move was stored
+    """
+    move_code = data & 0x7FFF
+    move = None
+    if move_code:
+        move = chess.Move(move_code & 0x3F, move_code >> 6 & 0x3F, (move_code >> 12) or None)
+    return data >> 17, move, data >> 15 & 3
+
+def score_to_tt(score, ply):
+    """
+    Convert a score for storing in the transposition table.
+
+    Mate scores count the distance to mate from the root of the search; the
+    table stores the distance from the node itself, so that the entry is
+    still right when the position is reached at another ply.
+
+    Args:
+        score: The score in centipawns
+        ply: Distance of the node from the root of the search
+
+    Returns:
+        The score to store
+    """
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+def score_from_tt(score, ply):
+    """
+    Convert a score read from the transposition table back for the search.
+
+    Args:
+        score: The stored score, as returned by score_to_tt
+        ply: Distance of the node from the root of the search
+
+    Returns:
+        The score in centipawns, with mates counted from the root
+    """
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
 class SearchAlgorithm:
     """
     Class implementing advanced search algorithms for chess position evaluation.
@@ -38,27 +157,52 @@ class SearchAlgorithm:
         self.cache_hits = 0
         self.start_time = 0
         self.time_limit = 0
+        self._time_expiry = 0  # Absolute time at which the search must stop
+        self._time_checks = 0  # Number of time checks since the clock was last read
+        self._time_up = False  # Cached result of the last clock read
         self.best_move = None
         self.best_score = 0
         self.thinking_lines = []
+        self.killers = [[None, None] for _ in range(MAX_PLY)]  # Two killer moves per ply
+        self.history = {}  # (from_square, to_square) -> history score
 
     def reset_stats(self):
-        """Reset search statistics."""
+        """Reset search statistics and move ordering heuristics."""
         self.nodes_searched = 0
         self.q_nodes_searched = 0
         self.null_move_cutoffs = 0
         self.positions_cached = 0
         self.cache_hits = 0
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {}
 
     def set_time_limit(self, seconds):
         """Set a time limit for the search."""
         self.time_limit = seconds
 
-    def is_time_up(self):
-        """Check if the search time limit has been reached."""
+    def is_time_up(self, force=False):
+        """
+        Check if the search time limit has been reached.
+
+        The clock is only read every TIME_CHECK_MASK + 1 calls; in between the
+        cached result is returned. Once time is up it stays up until the next
+        search.
+
+        Args:
+            force: Read the clock regardless of how many calls have been made
+
+        Returns:
+            True if the search should stop
+        """
         if self.time_limit <= 0:
             return False
-        return time.time() - self.start_time >= self.time_limit
+        if self._time_up:
+            return True
+        self._time_checks += 1
+        if not force and self._time_checks & TIME_CHECK_MASK:
+            return False
+        self._time_up = time.time() >= self._time_expiry
+        return self._time_up
 
     def search(self, board, depth=None, time_limit=None):
         """
@@ -70,7 +214,8 @@ class SearchAlgorithm:
             time_limit: Time limit in seconds (overrides self.time_limit if provided)
 
         Returns:
-            A tuple (best_move, score, thinking_lines)
+            A tuple (best_move, score, thinking_lines), with the score in pawns
+            from the side to move's perspective
         """
         if depth is not None:
             self.max_depth = depth
@@ -80,240 +225,426 @@ class SearchAlgorithm:
 
         self.reset_stats()
         self.start_time = time.time()
+        self._time_expiry = self.start_time + self.time_limit
+        self._time_checks = 0
+        self._time_up = False
         self.thinking_lines = []
+        self.best_move = None
 
-        # Use iterative deepening
+        # Entries from earlier searches may now be replaced by new ones
+        if self.transposition_table:
+            self.transposition_table.new_search()
+
+        # Use iterative deepening. Scores are integer centipawns internally.
+        previous_score = 0
         for current_depth in range(1, self.max_depth + 1):
-            if self.is_time_up():
+            if self.is_time_up(force=True):
                 break
 
-            # Search with alpha-beta pruning
-            score = self.alpha_beta(board, current_depth, float('-inf'), float('inf'), True)
+            # Search with alpha-beta pruning. From ASPIRATION_MIN_DEPTH on, start
+            # with a narrow window around the previous score and widen the side
+            # that fails.
+            if current_depth >= ASPIRATION_MIN_DEPTH:
+                alpha = previous_score - ASPIRATION_WINDOW
+                beta = previous_score + ASPIRATION_WINDOW
+            else:
+                alpha = -MATE
+                beta = MATE
+
+            while True:
+                score = self._search_root(board, current_depth, alpha, beta)
+                if self._time_up:
+                    break
+                # A bound that is already at the mate score cannot be widened,
+                # as when the side to move is checkmated at the root
+                if score <= alpha and alpha > -MATE:
+                    alpha = -MATE
+                elif score >= beta and beta < MATE:
+                    beta = MATE
+                else:
+                    break
 
             # Store the best move and score at this depth
-            if not self.is_time_up():
-                self.best_score = score
+            if not self._time_up:
+                previous_score = score
+                self.best_score = score / 100
 
                 # Add thinking line for this depth
                 if self.best_move:
                     try:
                         move_san = board.san(self.best_move)
-                        self.thinking_lines.append(f"depth {current_depth}: {move_san} ({score:.2f})")
+                        self.thinking_lines.append(f"depth {current_depth}: {move_san} ({self.best_score:.2f})")
                     except ValueError:
                         # If SAN generation fails, use UCI notation
-                        self.thinking_lines.append(f"depth {current_depth}: {self.best_move.uci()} ({score:.2f})")
+                        self.thinking_lines.append(f"depth {current_depth}: {self.best_move.uci()} ({self.best_score:.2f})")
 
         # Return the best move found, its score, and thinking lines
         return self.best_move, self.best_score, self.thinking_lines
 
-    def alpha_beta(self, board, depth, alpha, beta, maximizing_player):
+    def _search_root(self, board, depth, alpha, beta):
+        """
+        Search the root position and record the best move in self.best_move.
+
+        Root moves are searched with PVS and late move reductions like interior
+        nodes, but the root never takes a null-move or transposition table
+        cutoff, so a best move is always found.
+
+        Args:
+            board: A chess.Board object
+            depth: Search depth for this iteration
+            alpha: Alpha value for pruning
+            beta: Beta value for pruning
+
+        Returns:
+            The evaluation score in centipawns from the side to move's perspective
+        """
+        self.nodes_searched += 1
+        alpha_orig = alpha
+        alpha_beta = self.alpha_beta
+        tt = self.transposition_table
+
+        # The previous iteration's best move is searched first
+        tt_move = None
+        if tt:
+            tt_key = tt.compute_hash(board)
+            hit, entry = tt.get_by_key(tt_key)
+            if hit:
+                _, tt_move, _ = unpack_tt_data(entry[1])
+
+        in_check = board.is_check()
+        killers = self.killers[0]
+
+        best_score = -MATE
+        best_move = None
+        for move_index, move in enumerate(self.order_moves(board, board.legal_moves, 0, tt_move)):
+            is_capture = board.is_capture(move)
+            child_key = tt.hash_after_move(tt_key, board, move) if tt and depth > 1 else None
+            board.push(move)
+            gives_check = board.is_check()
+            new_depth = depth if gives_check else depth - 1
+
+            if move_index == 0:
+                score = -alpha_beta(board, new_depth, -beta, -alpha, 1, child_key)
+            else:
+                reduction = 0
+                if (depth >= LMR_MIN_DEPTH and move_index >= LMR_MIN_MOVE_INDEX
+                        and not in_check and not is_capture and not move.promotion
+                        and move not in killers and not gives_check):
+                    reduction = 1 if depth < 6 else 2
+
+                score = -alpha_beta(board, new_depth - reduction, -alpha - 1, -alpha, 1, child_key)
+                if reduction and score > alpha:
+                    score = -alpha_beta(board, new_depth, -alpha - 1, -alpha, 1, child_key)
+                if alpha < score < beta:
+                    score = -alpha_beta(board, new_depth, -beta, -alpha, 1, child_key)
+
+            board.pop()
+
+            # Scores from a search cut short by the time limit are not reliable
+            if self._time_up:
+                break
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                self.best_move = move
+
+            alpha = max(alpha, best_score)
+            if alpha >= beta:
+                break
+
+        # No legal moves: checkmate or stalemate
+        if best_move is None:
+            return -MATE if in_check else 0
+
+        if tt and not self._time_up:
+            if best_score <= alpha_orig:
+                flag = TT_UPPER
+            elif best_score >= beta:
+                flag = TT_LOWER
+            else:
+                flag = TT_EXACT
+            tt.put_by_key(tt_key, pack_tt_data(best_score, best_move, flag), depth)
+            self.positions_cached += 1
+
+        return best_score
+
+    def alpha_beta(self, board, depth, alpha, beta, ply=0, tt_key=None):
         """
-        Alpha-beta pruning search algorithm.
+        Negamax alpha-beta search with principal variation search (PVS).
+
+        The first move at each node is searched with the full window; the
+        remaining moves are searched with a null window and only re-searched
+        with the full window if they fail high. Late quiet moves are searched
+        at a reduced depth first (late move reductions) and re-searched at
+        full depth if they beat alpha. Moves that give check are extended by
+        one ply.
 
         Args:
             board: A chess.Board object
-            depth: Current search depth
+            depth: Remaining search depth
             alpha: Alpha value for pruning
             beta: Beta value for pruning
-            maximizing_player: Whether the current player is maximizing
+            ply: Distance from the root of the search
+            tt_key: The transposition table hash of the position, if the caller
+                already derived it from the parent's hash (see
+                TranspositionTable.hash_after_move)
 
         Returns:
-            The evaluation score for the position
+            The evaluation score for the position in centipawns from the side
+            to move's perspective
         """
         # Increment nodes searched counter
         self.nodes_searched += 1
 
+        # Hoist attribute lookups used in the hot path into locals
+        is_time_up = self.is_time_up
+        tt = self.transposition_table
+        push = board.push
+        pop = board.pop
+        alpha_beta = self.alpha_beta
+
         # Check if we should stop the search due to time limit
-        if self.is_time_up():
+        if is_time_up():
             return 0
 
-        # Check transposition table
-        if self.transposition_table:
-            hit, entry = self.transposition_table.get(board, depth)
+        alpha_orig = alpha
+
+        # Check transposition table. A stored score is only used if its bound
+        # is valid for the current window; entries that are too shallow still
+        # provide the best move for move ordering. The root is always searched
+        # so that a best move is reported.
+        tt_move = None
+        if tt and depth > 0:
+            # Hash the position once for both the probe and the store below,
+            # unless the caller already updated the parent's hash for this move
+            if tt_key is None:
+                tt_key = tt.compute_hash(board)
+            hit, entry = tt.get_by_key(tt_key)
             if hit:
-                self.cache_hits += 1
-                return entry['data']['score']
-
-        # Base case: leaf node or terminal position
-        if board.is_game_over():
-            # Handle checkmate, stalemate, etc.
-            if board.is_checkmate():
-                # Return a high value for checkmate, adjusted by depth to prefer quicker mates
-                return -10000 + (self.max_depth - depth) if board.turn == maximizing_player else 10000 - (self.max_depth - depth)
-            else:
-                # Draw (stalemate, insufficient material, etc.)
-                return 0
+                tt_score, tt_move, flag = unpack_tt_data(entry[1])
+                tt_score = score_from_tt(tt_score, ply)
+                if ply > 0 and entry[2] >= depth:
+                    if (flag == TT_EXACT or (flag == TT_LOWER and tt_score >= beta)
+                            or (flag == TT_UPPER and tt_score <= alpha)):
+                        self.cache_hits += 1
+                        return tt_score
+
+        # Draws that do not depend on the legal moves. Checkmate and stalemate
+        # are detected from the move loop below, which avoids generating the
+        # legal moves an extra time through board.is_game_over().
+        if (board.is_insufficient_material() or board.is_seventyfive_moves()
+                or board.is_fivefold_repetition()):
+            return 0
+
+        in_check = board.is_check()
 
         # If we've reached the depth limit, use quiescence search if enabled
         if depth <= 0:
+            # The side to move is mated; prefer quicker mates
+            if in_check and board.is_checkmate():
+                return -MATE + ply
             if self.use_quiescence:
-                return self.quiescence_search(board, alpha, beta, maximizing_player, self.quiescence_depth)
+                return self.quiescence_search(board, alpha, beta, self.quiescence_depth)
             else:
-                # Evaluate the position
-                score = self.evaluator(board)
+                # Evaluate the position in centipawns
+                score = int(self.evaluator(board) * 100)
                 # Adjust score based on perspective
                 return score if board.turn == chess.WHITE else -score
 
-        # Try null-move pruning if enabled and appropriate
-        if self.use_null_move and depth >= 2 and not self.is_endgame(board) and not board.is_check():
+        # Try null-move pruning if enabled and appropriate. The root and nodes with
+        # an unbounded beta are skipped, since the null window would be infinite.
+        if (self.use_null_move and ply > 0 and depth >= 2 and beta < MATE
+                and not self.is_endgame(board) and not in_check):
+            null_depth = depth - 1 - self.null_move_reduction
+            null_move = chess.Move.null()
+            null_key = tt.hash_after_move(tt_key, board, null_move) if tt and null_depth > 0 else None
+
             # Skip the current player's turn (make a "null move")
-            board.push(chess.Move.null())
+            push(null_move)
 
             # Search with reduced depth (R=2 or R=3 typically)
-            null_score = -self.alpha_beta(board, depth - 1 - self.null_move_reduction, -beta, -beta + 1, not maximizing_player)
+            null_score = -alpha_beta(board, null_depth, -beta, -beta + 1, ply + 1, null_key)
 
             # Undo the null move
-            board.pop()
+            pop()
 
             # If the score is good enough, we can prune this branch
-            if null_score >= beta and not self.is_time_up():
+            if null_score >= beta and not self._time_up:
                 self.null_move_cutoffs += 1
                 return beta
 
-        # Get legal moves and sort them for better pruning
-        legal_moves = list(board.legal_moves)
-        ordered_moves = self.order_moves(board, legal_moves)
+        # Sort the legal moves for better pruning
+        ordered_moves = self.order_moves(board, board.legal_moves, ply, tt_move)
+        killers = self.killers[ply] if ply < MAX_PLY else ()
+        max_extended_ply = min(2 * self.max_depth, MAX_PLY - 1)
 
-        if maximizing_player:
-            best_score = float('-inf')
-            for move in ordered_moves:
-                # Make the move
-                board.push(move)
+        # Children at depth 0 are not looked up, so their hash is not needed
+        hash_after_move = tt.hash_after_move if tt and depth > 1 else None
 
-                # Recursively evaluate the position
-                score = self.alpha_beta(board, depth - 1, alpha, beta, False)
+        best_score = -MATE
+        best_move = None
+        for move_index, move in enumerate(ordered_moves):
+            is_capture = board.is_capture(move)
+            child_key = hash_after_move(tt_key, board, move) if hash_after_move else None
 
-                # Undo the move
-                board.pop()
+            # Make the move
+            push(move)
+            gives_check = board.is_check()
 
-                # Update best score and alpha
-                if score > best_score:
-                    best_score = score
-                    if depth == self.max_depth:
-                        self.best_move = move
+            # Extend checking moves by one ply, as long as the branch stays
+            # within twice the nominal depth so perpetual checks terminate
+            new_depth = depth - 1
+            if gives_check and ply + depth < max_extended_ply:
+                new_depth = depth
 
-                alpha = max(alpha, best_score)
+            if move_index == 0:
+                # Search the first (expected best) move with the full window
+                score = -alpha_beta(board, new_depth, -beta, -alpha, ply + 1, child_key)
+            else:
+                # Reduce late quiet moves that are unlikely to raise alpha
+                reduction = 0
+                if (depth >= LMR_MIN_DEPTH and move_index >= LMR_MIN_MOVE_INDEX
+                        and not in_check and not is_capture and not move.promotion
+                        and move not in killers and not gives_check):
+                    reduction = 1 if depth < 6 else 2
 
-                # Alpha-beta pruning
-                if beta <= alpha:
-                    break
+                # Prove the remaining moves are worse with a null window
+                score = -alpha_beta(board, new_depth - reduction, -alpha - 1, -alpha, ply + 1, child_key)
 
-                # Check time limit
-                if self.is_time_up():
-                    break
+                # A reduced move that beats alpha is verified at full depth
+                if reduction and score > alpha:
+                    score = -alpha_beta(board, new_depth, -alpha - 1, -alpha, ply + 1, child_key)
 
-            # Store in transposition table
-            if self.transposition_table and not self.is_time_up():
-                self.transposition_table.put(board, {'score': best_score}, depth)
-                self.positions_cached += 1
+                # Re-search with the full window if the move turned out better
+                if alpha < score < beta:
+                    score = -alpha_beta(board, new_depth, -beta, -alpha, ply + 1, child_key)
 
-            return best_score
-        else:
-            best_score = float('inf')
-            for move in ordered_moves:
-                # Make the move
-                board.push(move)
+            # Undo the move
+            pop()
 
-                # Recursively evaluate the position
-                score = self.alpha_beta(board, depth - 1, alpha, beta, True)
+            # Update best score and alpha
+            if score > best_score:
+                best_score = score
+                best_move = move
 
-                # Undo the move
-                board.pop()
+            alpha = max(alpha, best_score)
 
-                # Update best score and beta
-                if score < best_score:
-                    best_score = score
-                    if depth == self.max_depth:
-                        self.best_move = move
+            # Alpha-beta pruning
+            if alpha >= beta:
+                # Remember quiet moves that caused a cutoff for move ordering
+                if not is_capture:
+                    self.update_move_heuristics(move, depth, ply)
+                break
 
-                beta = min(beta, best_score)
+            # Stop once the time limit has been detected deeper in the tree
+            if self._time_up:
+                break
 
-                # Alpha-beta pruning
-                if beta <= alpha:
-                    break
+        # No legal moves: checkmate or stalemate
+        if best_move is None and not self._time_up:
+            # Prefer quicker mates
+            return -MATE + ply if in_check else 0
+
+        # Store in transposition table along with the kind of bound the score is
+        if tt and not self._time_up:
+            if best_score <= alpha_orig:
+                flag = TT_UPPER
+            elif best_score >= beta:
+                flag = TT_LOWER
+            else:
+                flag = TT_EXACT
+            tt.put_by_key(tt_key, pack_tt_data(score_to_tt(best_score, ply), best_move, flag), depth)
+            self.positions_cached += 1
 
-                # Check time limit
-                if self.is_time_up():
-                    break
+        return best_score
+
+    def update_move_heuristics(self, move, depth, ply):
+        """
+        Record a quiet move that caused a beta cutoff in the killer and history tables.
 
-            # Store in transposition table
-            if self.transposition_table and not self.is_time_up():
-                self.transposition_table.put(board, {'score': best_score}, depth)
-                self.positions_cached += 1
+        Args:
+            move: The quiet move that caused the cutoff
+            depth: Remaining search depth at the node
+            ply: Distance from the root of the search
+        """
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
 
-            return best_score
+        key = (move.from_square, move.to_square)
+        self.history[key] = self.history.get(key, 0) + depth * depth
 
-    def order_moves(self, board, moves):
+    def order_moves(self, board, moves, ply=None, tt_move=None):
         """
         Order moves to improve alpha-beta pruning efficiency.
-        Captures, checks, and promotions are examined first.
+        The transposition table move is examined first, then captures, checks,
+        and promotions, followed by killer moves and quiet moves with a good
+        history score.
+
+        Moves are yielded lazily using a partial selection sort: alpha-beta
+        usually only consumes the first few moves before a cutoff, so there is
+        no need to fully sort the list.
 
         Args:
             board: A chess.Board object
-            moves: List of legal moves
+            moves: Iterable of legal moves (e.g. board.legal_moves)
+            ply: Distance from the root, used to look up killer moves (None to skip)
+            tt_move: Best move stored in the transposition table, if any
 
-        Returns:
-            Ordered list of moves
+        Yields:
+            Moves in descending order of their ordering score
         """
-        # Score each move for ordering
-        move_scores = []
+        killers = self.killers[ply] if ply is not None and ply < MAX_PLY else ()
+        history = self.history
+        piece_type_at = board.piece_type_at
+
+        # Score each move for ordering in a single pass over the moves
+        scored_moves = []
 
         for move in moves:
             score = 0
 
+            # Search the transposition table move first
+            if move == tt_move:
+                score += TT_MOVE_BONUS
+
             # Prioritize captures by MVV-LVA (Most Valuable Victim - Least Valuable Aggressor)
             if board.is_capture(move):
-                victim_value = self.get_piece_value(board.piece_at(move.to_square))
-                aggressor_value = self.get_piece_value(board.piece_at(move.from_square))
+                if board.is_en_passant(move):
+                    victim_value = PIECE_VALUES[chess.PAWN]
+                else:
+                    victim_value = PIECE_VALUES[piece_type_at(move.to_square)]
+                aggressor_value = PIECE_VALUES[piece_type_at(move.from_square)]
                 score += 10 * victim_value - aggressor_value
+            else:
+                # Order quiet moves by killer and history heuristics
+                if move in killers:
+                    score += KILLER_MOVE_BONUS
+                score += history.get((move.from_square, move.to_square), 0)
 
             # Prioritize promotions
             if move.promotion:
                 score += 900  # Queen promotion value
 
             # Prioritize checks
-            board.push(move)
-            if board.is_check():
+            if board.gives_check(move):
                 score += 50
-            board.pop()
-
-            # Add a small random factor to avoid deterministic behavior
-            score += 0.01 * hash(move.uci()) % 100
-
-            move_scores.append((move, score))
-
-        # Sort moves by score (descending)
-        move_scores.sort(key=lambda x: x[1], reverse=True)
-
-        # Return ordered moves
-        return [move for move, _ in move_scores]
-
-    def get_piece_value(self, piece):
-        """
-        Get the value of a piece for move ordering.
-
-        Args:
-            piece: A chess.Piece object or None
 
-        Returns:
-            The value of the piece
-        """
-        if piece is None:
-            return 0
-
-        # Piece values for move ordering
-        values = {
-            chess.PAWN: 10,
-            chess.KNIGHT: 30,
-            chess.BISHOP: 30,
-            chess.ROOK: 50,
-            chess.QUEEN: 90,
-            chess.KING: 900
-        }
+            scored_moves.append((score, move))
 
-        return values.get(piece.piece_type, 0)
+        # Select the best remaining move each time the caller asks for one
+        while scored_moves:
+            best_index = max(range(len(scored_moves)), key=lambda i: scored_moves[i][0])
+            best_move = scored_moves[best_index][1]
+            # Fill the gap with the last entry instead of shifting the list
+            scored_moves[best_index] = scored_moves[-1]
+            scored_moves.pop()
+            yield best_move
 
-    def quiescence_search(self, board, alpha, beta, maximizing_player, depth):
+    def quiescence_search(self, board, alpha, beta, depth):
         """
         Quiescence search to evaluate tactical positions more accurately.
         Only considers captures and checks to reach a "quiet" position.
@@ -322,11 +653,11 @@ class SearchAlgorithm:
             board: A chess.Board object
             alpha: Alpha value for pruning
             beta: Beta value for pruning
-            maximizing_player: Whether the current player is maximizing
             depth: Maximum quiescence search depth
 
         Returns:
-            The evaluation score for the position
+            The evaluation score for the position in centipawns from the side
+            to move's perspective
         """
         # Increment quiescence nodes searched counter
         self.q_nodes_searched += 1
@@ -336,7 +667,7 @@ class SearchAlgorithm:
             return 0
 
         # Stand pat: Evaluate the current position
-        stand_pat = self.evaluator(board)
+        stand_pat = int(self.evaluator(board) * 100)
         stand_pat = stand_pat if board.turn == chess.WHITE else -stand_pat
 
         # Beta cutoff
@@ -358,19 +689,28 @@ class SearchAlgorithm:
         if not tactical_moves:
             return stand_pat
 
-        # Order moves for better pruning
-        ordered_moves = self.order_moves(board, tactical_moves)
+        # Delta pruning is unsafe when in check
+        use_delta_pruning = not board.is_check()
+
+        # Search tactical moves, best first
+        push = board.push
+        pop = board.pop
+        quiescence_search = self.quiescence_search
+        for move, is_capture in self.order_tactical(tactical_moves):
+            # Skip captures that cannot raise the score to alpha
+            if use_delta_pruning and is_capture and not move.promotion:
+                captured_type = board.piece_type_at(move.to_square) or chess.PAWN
+                if stand_pat + PIECE_VALUES[captured_type] * 10 + DELTA_MARGIN < alpha:
+                    continue
 
-        # Search tactical moves
-        for move in ordered_moves:
             # Make the move
-            board.push(move)
+            push(move)
 
             # Recursively evaluate the position
-            score = -self.quiescence_search(board, -beta, -alpha, not maximizing_player, depth - 1)
+            score = -quiescence_search(board, -beta, -alpha, depth - 1)
 
             # Undo the move
-            board.pop()
+            pop()
 
             # Beta cutoff
             if score >= beta:
@@ -386,30 +726,64 @@ class SearchAlgorithm:
         """
         Get tactical moves (captures and checks) for quiescence search.
 
+        Each move is scored for ordering while it is classified, so the board
+        only has to be examined once per move.
+
         Args:
             board: A chess.Board object
 
         Returns:
-            A list of tactical moves
+            A list of (score, move, is_capture) tuples
         """
         tactical_moves = []
+        piece_type_at = board.piece_type_at
 
         for move in board.legal_moves:
-            # Include captures
-            if board.is_capture(move):
-                tactical_moves.append(move)
+            is_capture = board.is_capture(move)
+            gives_check = board.gives_check(move)
+            if not is_capture and not gives_check:
                 continue
 
-            # Include checks (more expensive to calculate, so do it last)
-            board.push(move)
-            gives_check = board.is_check()
-            board.pop()
+            score = 0
 
+            # Order captures by MVV-LVA
+            if is_capture:
+                if board.is_en_passant(move):
+                    victim_value = PIECE_VALUES[chess.PAWN]
+                else:
+                    victim_value = PIECE_VALUES[piece_type_at(move.to_square)]
+                score += 10 * victim_value - PIECE_VALUES[piece_type_at(move.from_square)]
+
+            if move.promotion:
+                score += 900
             if gives_check:
-                tactical_moves.append(move)
+                score += 50
+
+            tactical_moves.append((score, move, is_capture))
 
         return tactical_moves
 
+    def order_tactical(self, tactical_moves):
+        """
+        Order scored tactical moves from get_tactical_moves, best first.
+
+        Like order_moves, this is a partial selection sort that yields lazily.
+        The list is consumed in the process.
+
+        Args:
+            tactical_moves: List of (score, move, is_capture) tuples
+
+        Yields:
+            (move, is_capture) tuples in descending order of score
+        """
+        while tactical_moves:
+            best_index = max(range(len(tactical_moves)), key=lambda i: tactical_moves[i][0])
+            _, move, is_capture = tactical_moves[best_index]
+            # Fill the gap with the last entry instead of shifting the list
+            tactical_moves[best_index] = tactical_moves[-1]
+            tactical_moves.pop()
+            yield move, is_capture
+
     def is_endgame(self, board):
         """
         Determine if the position is an endgame position.
@@ -421,17 +795,11 @@ class SearchAlgorithm:
         Returns:
             True if the position is an endgame, False otherwise
         """
-        # Count the number of non-pawn pieces for each side
-        white_pieces = 0
-        black_pieces = 0
-
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece and piece.piece_type != chess.PAWN:
-                if piece.color == chess.WHITE:
-                    white_pieces += 1
-                else:
-                    black_pieces += 1
+        # Count the number of non-pawn pieces (king included) for each side
+        # directly from the bitboards
+        non_pawns = ~board.pawns
+        white_pieces = chess.popcount(board.occupied_co[chess.WHITE] & non_pawns)
+        black_pieces = chess.popcount(board.occupied_co[chess.BLACK] & non_pawns)
 
         # Consider it an endgame if either side has <= 2 non-pawn pieces
         return white_pieces <= 2 or black_pieces <= 2
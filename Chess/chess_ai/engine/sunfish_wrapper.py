@@ -4,6 +4,7 @@ This module provides a wrapper for the Sunfish chess engine.
 """
 
 import chess
+import chess.polyglot
 import random
 import time
 import os
@@ -13,7 +14,7 @@ from chess_ai.engine.opening_book import OpeningBook
 # Import the transposition table module
 from chess_ai.engine.transposition_table import TranspositionTable
 # Import the search algorithm
-from chess_ai.engine.search import SearchAlgorithm
+from chess_ai.engine.search import SearchAlgorithm, PIECE_VALUES
 # Import the learning system
 from chess_ai.engine.learning import LearningSystem
 # Import the positional evaluator
@@ -22,11 +23,37 @@ from chess_ai.engine.evaluation import PositionalEvaluator
 # We'll implement our own simplified version instead of importing sunfish
 # This avoids the import error with the tools module
 
+# Initialization errors worth retrying (e.g. a data file that is briefly unavailable)
+TRANSIENT_INIT_ERRORS = (OSError,)
+
+# Delay before the first initialization retry, doubled on each further attempt
+INIT_RETRY_DELAY = 0.05
+
+# Search depth for each skill level (index 0 is unused, levels are clamped to 1-20)
+# Skill level 1-5: depth 1, 6-10: depth 2, 11-15: depth 3, 16-20: depth 4
+DEPTH_TABLE = (0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4)
+
+# Quiescence search depth for each skill level (0 disables quiescence search)
+# Skill level 1-5: depth 0, 6-10: depth 1, 11-15: depth 2, 16-20: depth 3
+QUIESCENCE_DEPTH_TABLE = (0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3)
+
 class EngineInitializationError(Exception):
     """Exception raised when the chess engine fails to initialize."""
     pass
 
 class SunfishWrapper:
+    # Every instance attribute is set in __init__; slots keep instances small
+    # and make attribute access cheaper during evaluation
+    __slots__ = (
+        'last_evaluation', 'thinking_lines', 'top_moves', 'best_move_found',
+        'use_opening_book', 'opening_book', 'game_moves',
+        'use_transposition_table', 'transposition_table',
+        'use_alpha_beta', 'use_quiescence', 'use_null_move', 'search_algorithm',
+        'use_learning', 'learning_system',
+        'use_positional_eval', 'positional_evaluator',
+        'is_initialized', 'skill_level',
+    )
+
     def __init__(self, max_retries=3, use_opening_book=True, book_path=None, use_transposition_table=True, use_alpha_beta=True, use_quiescence=True, use_null_move=True, use_learning=True, learning_data_file=None, use_positional_eval=True):
         """Initialize a simplified chess engine based on Sunfish concepts.
 
@@ -48,6 +75,8 @@ class SunfishWrapper:
         # Store analysis information
         self.last_evaluation = None
         self.thinking_lines = []
+        # The analysed moves as (move_uci, 'cp' or 'mate', value) tuples, best first
+        self.top_moves = []
         self.best_move_found = None
 
         # Opening book configuration
@@ -80,12 +109,6 @@ class SunfishWrapper:
         # Try to initialize the engine with retries
         for attempt in range(max_retries):
             try:
-                # Simulate potential initialization failures (for testing)
-                # In a real scenario, this would be actual initialization code
-                import random
-                if random.random() < 0.1:  # 10% chance of failure for testing
-                    raise ValueError("Simulated random initialization failure")
-
                 # Initialize required resources
                 self._initialize_resources()
 
@@ -95,12 +118,11 @@ class SunfishWrapper:
                 break
             except Exception as e:
                 print(f"Engine initialization attempt {attempt+1}/{max_retries} failed: {e}")
-                # If this was the last attempt, raise an exception
-                if attempt == max_retries - 1:
-                    raise EngineInitializationError(f"Failed to initialize engine after {max_retries} attempts: {e}")
-                # Otherwise wait a bit and retry
-                import time
-                time.sleep(0.5)
+                # Only transient errors are retried, and only until the last attempt
+                if not isinstance(e, TRANSIENT_INIT_ERRORS) or attempt == max_retries - 1:
+                    raise EngineInitializationError(f"Failed to initialize engine after {attempt+1} attempts: {e}")
+                # Otherwise back off exponentially and retry
+                time.sleep(INIT_RETRY_DELAY * (2 ** attempt))
 
     def _initialize_resources(self):
         """Initialize any resources needed by the engine."""
@@ -127,19 +149,7 @@ class SunfishWrapper:
         Returns:
             An integer representing the search depth
         """
-        # Map skill levels to search depths
-        # Skill level 1-5: depth 1
-        # Skill level 6-10: depth 2
-        # Skill level 11-15: depth 3
-        # Skill level 16-20: depth 4
-        if self.skill_level <= 5:
-            return 1
-        elif self.skill_level <= 10:
-            return 2
-        elif self.skill_level <= 15:
-            return 3
-        else:
-            return 4
+        return DEPTH_TABLE[self.skill_level]
 
     def _get_quiescence_depth_for_skill_level(self):
         """
@@ -148,19 +158,7 @@ class SunfishWrapper:
         Returns:
             An integer representing the quiescence search depth
         """
-        # Map skill levels to quiescence search depths
-        # Skill level 1-5: depth 0 (no quiescence search)
-        # Skill level 6-10: depth 1
-        # Skill level 11-15: depth 2
-        # Skill level 16-20: depth 3
-        if self.skill_level <= 5:
-            return 0
-        elif self.skill_level <= 10:
-            return 1
-        elif self.skill_level <= 15:
-            return 2
-        else:
-            return 3
+        return QUIESCENCE_DEPTH_TABLE[self.skill_level]
 
     def set_difficulty(self, level):
         """
@@ -466,14 +464,15 @@ class SunfishWrapper:
 
         # Clear previous analysis
         self.thinking_lines = []
+        self.top_moves = []
 
         # Start timing for analysis
         start_time = time.time()
+        legal_moves = None
 
         try:
-            # Get legal moves
-            legal_moves = list(board.legal_moves)
-            if not legal_moves:
+            # Stop at the first legal move found rather than generating them all
+            if not board.legal_moves:
                 return None
 
             # Try to get a move from the opening book if enabled
@@ -488,6 +487,7 @@ class SunfishWrapper:
 
                     # Generate some fake analysis for display
                     self.thinking_lines = [f"{board.san(book_move)}: 0.00 (book move)"]
+                    self.top_moves = [(self.best_move_found, 'cp', 0)]
                     self.last_evaluation = {"type": "cp", "value": 0}
 
                     # Get additional book moves for display
@@ -495,9 +495,13 @@ class SunfishWrapper:
                     if len(book_moves) > 1:
                         for move, weight in book_moves[1:]:
                             self.thinking_lines.append(f"{board.san(move)}: 0.00 (book: {weight})")
+                            self.top_moves.append((move.uci(), 'cp', 0))
 
                     return self.best_move_found
 
+            # Book moves need no move list, so only generate it now
+            legal_moves = list(board.legal_moves)
+
             # If no book move or book is disabled, use the engine
             if self.use_alpha_beta and self.search_algorithm:
                 # Use alpha-beta search
@@ -513,6 +517,7 @@ class SunfishWrapper:
                         "type": "cp",
                         "value": int(score * 100)  # Convert to centipawns
                     }
+                    self.top_moves = [(self.best_move_found, 'cp', self.last_evaluation['value'])]
 
                     # Print search stats
                     stats = self.search_algorithm.get_stats()
@@ -548,8 +553,10 @@ class SunfishWrapper:
             return self.best_move_found
         except Exception as e:
             print(f"Error getting best move: {e}")
-            # In case of error, return a random legal move if possible
+            # In case of error, return a random legal move if possible. The
+            # move list is only built after the book lookup, which may have failed.
             try:
+                legal_moves = legal_moves or list(board.legal_moves)
                 if legal_moves:
                     random_move = random.choice(legal_moves)
                     return random_move.uci()
@@ -562,28 +569,45 @@ class SunfishWrapper:
 
         Optimized version that caches evaluations and avoids redundant calculations.
         """
-        # Create a list to store our thinking lines
-        thinking_lines = []
+        # Create a list to store (evaluation, evaluation string, move, evaluation info)
+        scored_lines = []
 
         # If no legal moves, return empty analysis
         if not legal_moves:
             self.thinking_lines = []
+            self.top_moves = []
             self.last_evaluation = {"type": "cp", "value": 0}
             return
 
         # Get up to 3 moves to analyze, but prioritize captures and checks
         # for more interesting analysis
+        # Captures are found by masking the target square against the opponent's
+        # pieces; gives_check is only evaluated for the remaining moves
+        opponent = board.occupied_co[not board.turn]
+        bb_squares = chess.BB_SQUARES
+        check_candidates = self._check_candidate_mask(board)
         captures_and_checks = [move for move in legal_moves
-                             if board.is_capture(move) or
-                                board.gives_check(move)]
+                             if bb_squares[move.to_square] & opponent or
+                                board.is_en_passant(move) or
+                                (self._may_give_check(board, move, check_candidates) and
+                                 board.gives_check(move))]
 
-        # If we have captures or checks, prioritize them
+        # If we have captures or checks, analyze the three best by MVV-LVA
+        # (Most Valuable Victim - Least Valuable Aggressor)
         if captures_and_checks and len(captures_and_checks) >= 3:
-            moves_to_analyze = random.sample(captures_and_checks, min(3, len(captures_and_checks)))
+            piece_type_at = board.piece_type_at
+
+            def mvv_lva(move):
+                victim = piece_type_at(move.to_square) or 0
+                aggressor = piece_type_at(move.from_square) or 0
+                return 10 * PIECE_VALUES[victim] - PIECE_VALUES[aggressor]
+
+            moves_to_analyze = sorted(captures_and_checks, key=mvv_lva, reverse=True)[:3]
         else:
             # Fill remaining slots with other moves
             remaining = 3 - len(captures_and_checks)
-            other_moves = [move for move in legal_moves if move not in captures_and_checks]
+            captures_and_checks_set = set(captures_and_checks)
+            other_moves = [move for move in legal_moves if move not in captures_and_checks_set]
             if other_moves and remaining > 0:
                 moves_to_analyze = captures_and_checks + random.sample(other_moves, min(remaining, len(other_moves)))
             else:
@@ -596,31 +620,26 @@ class SunfishWrapper:
         # Cache for evaluations to avoid recalculating
         eval_cache = {}
 
-        # Generate evaluations with some randomness but influenced by piece values
-        for i, move in enumerate(moves_to_analyze):
-            # Get the move in SAN notation - this is expensive, so do it only once
-            try:
-                san_move = board.san(move)
-            except ValueError:
-                # If SAN generation fails, use UCI notation instead
-                san_move = move.uci() + " (UCI)"
+        # One scratch copy of the board (without the move stack) is reused for
+        # every candidate, so the caller's board is never modified
+        scratch = board.copy(stack=False)
 
-            # Make the move on a temporary board
-            temp_board = board.copy()
-            temp_board.push(move)
+        # Generate evaluations with some randomness but influenced by piece values
+        for move in moves_to_analyze:
+            scratch.push(move)
 
-            # Use board FEN as cache key (without move counter parts to save space)
-            fen_parts = temp_board.fen().split(' ')
-            cache_key = ' '.join(fen_parts[:4])  # Just position, side to move, castling, en passant
+            # Use the Zobrist hash as cache key (position, side to move, castling, en passant)
+            cache_key = chess.polyglot.zobrist_hash(scratch)
 
             # Check if we've already evaluated this position
-            if cache_key in eval_cache:
-                material_eval = eval_cache[cache_key]
-            else:
+            material_eval = eval_cache.get(cache_key)
+            if material_eval is None:
                 # Calculate material evaluation
-                material_eval = self._calculate_material(temp_board)
+                material_eval = self._calculate_material(scratch)
                 eval_cache[cache_key] = material_eval
 
+            scratch.pop()
+
             # Add some randomness based on skill level
             # Lower skill = more randomness
             randomness = (21 - self.skill_level) / 10.0
@@ -633,67 +652,155 @@ class SunfishWrapper:
             if abs(final_eval) > 5 and random.random() < 0.2:  # 20% chance for mate evaluation on big advantages
                 mate_in = random.randint(1, 5)
                 eval_str = f"Mate in {mate_in}"
-                if i == 0:  # Store the main evaluation
-                    self.last_evaluation = {"type": "mate", "value": mate_in if final_eval > 0 else -mate_in}
+                evaluation = {"type": "mate", "value": mate_in if final_eval > 0 else -mate_in}
             else:
                 eval_str = f"{final_eval:.2f}"
-                if i == 0:  # Store the main evaluation
-                    self.last_evaluation = {"type": "cp", "value": int(final_eval * 100)}
+                evaluation = {"type": "cp", "value": int(final_eval * 100)}
 
             # Add to thinking lines
-            thinking_lines.append(f"{san_move}: {eval_str}")
+            scored_lines.append((final_eval, eval_str, move, evaluation))
+
+        # Sort thinking lines by evaluation (best first). Evaluations are from
+        # white's perspective, so black's best lines have the lowest scores.
+        scored_lines.sort(key=lambda line: line[0], reverse=board.turn == chess.WHITE)
 
-        # Sort thinking lines by evaluation (best first)
+        # SAN needs a full legal move generation per move, so it is only used
+        # for the best line; the others use a cheap long algebraic form
+        thinking_lines = []
+        for index, (_, eval_str, move, _) in enumerate(scored_lines):
+            if index == 0:
+                try:
+                    move_str = board.san(move)
+                except ValueError:
+                    # If SAN generation fails, use UCI notation instead
+                    move_str = move.uci() + " (UCI)"
+            else:
+                move_str = self._format_move(board, move)
+            thinking_lines.append(f"{move_str}: {eval_str}")
         self.thinking_lines = thinking_lines
+        self.top_moves = [(move.uci(), evaluation['type'], evaluation['value'])
+                          for _, _, move, evaluation in scored_lines]
+
+        # The best line provides the main evaluation and the suggested move
+        _, _, best_move, self.last_evaluation = scored_lines[0]
+        self.best_move_found = best_move.uci()
+
+    def _format_move(self, board, move):
+        """
+        Format a move in long algebraic notation (e.g. "Ng1f3", "e2e4", "O-O").
+
+        Much cheaper than board.san(), and still accepted by board.parse_san().
+
+        Args:
+            board: A chess.Board object in the position before the move
+            move: A legal move on the board
+
+        Returns:
+            The formatted move
+        """
+        if board.is_castling(move):
+            return "O-O" if chess.square_file(move.to_square) > chess.square_file(move.from_square) else "O-O-O"
+
+        piece_type = board.piece_type_at(move.from_square)
+        if piece_type == chess.PAWN:
+            return move.uci()
+        return chess.piece_symbol(piece_type).upper() + move.uci()
+
+    def _check_candidate_mask(self, board):
+        """
+        Build a mask of squares involved in any move that can give check.
+
+        A move can only give check if it lands on a square that attacks the
+        opponent's king (a knight or pawn square, or a square in line with the
+        king) or leaves a square in line with the king (a discovered check).
+
+        Args:
+            board: A chess.Board object
+
+        Returns:
+            A bitboard of candidate squares, computed once per analysis
+        """
+        king = board.king(not board.turn)
+        if king is None:
+            return chess.BB_ALL
+
+        aligned = 0
+        for square in chess.SQUARES:
+            if chess.BB_RAYS[king][square]:
+                aligned |= chess.BB_SQUARES[square]
+
+        return aligned | chess.BB_KNIGHT_ATTACKS[king] | chess.BB_PAWN_ATTACKS[not board.turn][king]
+
+    def _may_give_check(self, board, move, check_candidates):
+        """
+        Cheaply rule out moves that cannot give check.
+
+        Args:
+            board: A chess.Board object
+            move: A legal move on the board
+            check_candidates: The mask from _check_candidate_mask
+
+        Returns:
+            False if the move certainly does not give check, True if it might
+        """
+        if move.promotion or board.is_castling(move):
+            return True
+        return bool((chess.BB_SQUARES[move.from_square] | chess.BB_SQUARES[move.to_square]) & check_candidates)
 
     def _calculate_material(self, board):
         """Calculate a position evaluation for the board.
 
         Uses either simple material counting or advanced positional evaluation
         based on configuration. Also uses the transposition table for caching.
-        """
-        # Check if this position is in the transposition table
-        if self.use_transposition_table and self.transposition_table:
-            hit, entry = self.transposition_table.get(board)
+        Only the raw evaluation is cached; learning adjustments are applied on
+        every call so the cache never holds stale learning data.
+        """
+        # Resolve the enabled components once, since this runs at every leaf
+        tt = self.transposition_table if self.use_transposition_table else None
+        positional_evaluator = self.positional_evaluator if self.use_positional_eval else None
+        learning_system = self.learning_system if self.use_learning else None
+
+        # Check if this position is in the transposition table. Evaluations are
+        # keyed by the polyglot Zobrist hash, which keeps them apart from the
+        # search entries keyed by the table's own hash, and stored as a bare float.
+        if tt:
+            key = chess.polyglot.zobrist_hash(board)
+            hit, entry = tt.get_by_key(key)
             if hit:
-                return entry['data']['material_eval']
+                eval_score = entry[1]
+                # The position was recorded for learning when it was first evaluated
+                if learning_system:
+                    return learning_system.adjust_evaluation(board, eval_score)
+                return eval_score
 
         # Use advanced positional evaluation if enabled
-        if self.use_positional_eval and self.positional_evaluator:
+        if positional_evaluator:
             # Get evaluation in centipawns and convert to pawns
-            eval_score = self.positional_evaluator.evaluate(board) / 100.0
+            eval_score = positional_evaluator.evaluate(board) / 100.0
         else:
-            # Use simple material counting
-            # Piece values
-            piece_values = {
-                chess.PAWN: 1.0,
-                chess.KNIGHT: 3.0,
-                chess.BISHOP: 3.0,
-                chess.ROOK: 5.0,
-                chess.QUEEN: 9.0,
-                chess.KING: 0.0  # King doesn't contribute to material count
-            }
-
-            # Use piece maps for faster evaluation
-            white_material = sum(piece_values[piece_type] * len(board.pieces(piece_type, chess.WHITE))
-                               for piece_type in piece_values)
-            black_material = sum(piece_values[piece_type] * len(board.pieces(piece_type, chess.BLACK))
-                               for piece_type in piece_values)
+            # Use simple material counting with popcounts on the piece bitboards
+            popcount = chess.popcount
+            white = board.occupied_co[chess.WHITE]
+            black = board.occupied_co[chess.BLACK]
 
             # Calculate the evaluation from white's perspective
-            eval_score = white_material - black_material
-
-        # Apply learning adjustments if enabled
-        if self.use_learning and self.learning_system:
-            # Record the position for learning
-            self.learning_system.record_position(board, eval_score)
+            eval_score = float(
+                (popcount(board.pawns & white) - popcount(board.pawns & black))
+                + 3 * (popcount(board.knights & white) - popcount(board.knights & black))
+                + 3 * (popcount(board.bishops & white) - popcount(board.bishops & black))
+                + 5 * (popcount(board.rooks & white) - popcount(board.rooks & black))
+                + 9 * (popcount(board.queens & white) - popcount(board.queens & black))
+            )
 
-            # Adjust evaluation based on learning data
-            eval_score = self.learning_system.adjust_evaluation(board, eval_score)
+        # Store the raw evaluation in the transposition table, once per position
+        if tt:
+            tt.put_if_absent(key, eval_score, 0)
 
-        # Store in transposition table
-        if self.use_transposition_table and self.transposition_table:
-            self.transposition_table.put(board, {'material_eval': eval_score}, depth=0)
+        # Apply learning adjustments if enabled
+        if learning_system:
+            # Record the position for learning and adjust the evaluation
+            # based on learning data
+            eval_score = learning_system.record_and_adjust(board, eval_score)
 
         return eval_score
 
@@ -745,46 +852,16 @@ class SunfishWrapper:
             raise RuntimeError("Cannot get top moves: Engine not initialized")
 
         try:
-            # If we already have thinking lines from a recent get_best_move call, convert them
-            if not self.thinking_lines:
+            # If we already have analysed moves from a recent get_best_move call, use them
+            if not self.top_moves:
                 # Generate new analysis
                 legal_moves = list(board.legal_moves)
                 self._generate_analysis(board, legal_moves)
 
-            # Convert thinking lines to the expected format
-            result = []
-            for line in self.thinking_lines[:num_moves]:
-                parts = line.split(': ')
-                if len(parts) == 2:
-                    move_san, eval_str = parts
-                    # Convert SAN to UCI
-                    try:
-                        temp_board = chess.Board(board.fen())
-                        try:
-                            move = temp_board.parse_san(move_san)
-                            move_uci = move.uci()
-                        except ValueError:
-                            # If the SAN move can't be parsed, it might be a UCI move already
-                            if '(UCI)' in move_san:
-                                move_uci = move_san.split(' ')[0]  # Extract the UCI part
-                            else:
-                                # Skip this move if we can't parse it
-                                continue
-
-                        # Parse evaluation
-                        if 'Mate in' in eval_str:
-                            mate_value = int(eval_str.split('Mate in ')[1])
-                            result.append({'Move': move_uci, 'Mate': mate_value})
-                        else:
-                            try:
-                                centipawn = int(float(eval_str) * 100)
-                                result.append({'Move': move_uci, 'Centipawn': centipawn})
-                            except ValueError:
-                                result.append({'Move': move_uci})
-                    except Exception as e:
-                        print(f"Error converting thinking line to move: {e}")
-
-            return result
+            # The analysis is kept as structured tuples, so no thinking line
+            # needs to be parsed back into a move and an evaluation
+            return [{'Move': move_uci, 'Mate' if eval_type == 'mate' else 'Centipawn': value}
+                    for move_uci, eval_type, value in self.top_moves[:num_moves]]
         except Exception as e:
             print(f"Error getting top moves: {e}")
             # Return empty list in case of error
@@ -5,13 +5,18 @@ This module provides a transposition table implementation for caching chess posi
 
 import chess
 import random
-import time
-from collections import OrderedDict
+import sys
+from array import array
 
 class TranspositionTable:
     """
     A transposition table for caching chess positions and their evaluations.
     Uses Zobrist hashing for efficient position identification.
+
+    Entries live in a fixed-size list indexed by the low bits of the hash, one
+    entry per slot. When two positions map to the same slot, the entry from
+    the deeper search is kept, unless it was stored during an earlier search
+    (an older generation, see new_search).
     """
     
     def __init__(self, max_size=1000000):
@@ -19,11 +24,17 @@ class TranspositionTable:
         Initialize the transposition table.
         
         Args:
-            max_size: Maximum number of positions to store in the table
+            max_size: Maximum number of positions to store in the table, rounded
+                up to a power of two
         """
         self.max_size = max_size
-        self.table = OrderedDict()  # Using OrderedDict for LRU functionality
-        self.zobrist_keys = self._initialize_zobrist_keys()
+        self.num_slots = 1 << max(0, max_size - 1).bit_length()
+        self.mask = self.num_slots - 1
+        # Each slot holds a (board_hash, data, depth, generation) tuple or None
+        self.table = [None] * self.num_slots
+        self.size = 0
+        self.generation = 0
+        self._initialize_zobrist_keys()
         self.hits = 0
         self.misses = 0
         self.collisions = 0
@@ -32,37 +43,47 @@ class TranspositionTable:
         """
         Initialize Zobrist keys for efficient board hashing.
         
-        Returns:
-            A dictionary of random 64-bit integers for each piece on each square,
-            plus additional keys for castling rights, en passant, and side to move.
+        Sets the following attributes:
+            piece_keys: A flat list of random 64-bit integers for each piece on
+                each square, indexed by (color * 6 + piece_type - 1) * 64 + square
+            castling_K_key, castling_Q_key, castling_k_key, castling_q_key:
+                Keys for the four castling rights
+            ep_keys: A list of keys for each en passant square
+            side_to_move_key: The key for black to move
         """
         # Create a random number generator with a fixed seed for consistency
         rng = random.Random(42)
         
-        # Initialize the keys dictionary
-        keys = {}
+        # Draw all keys at once and split the bits into 64-bit integers:
+        # 12 * 64 piece keys, 4 castling keys, 64 en passant keys and the
+        # side to move key
+        num_keys = 12 * 64 + 4 + 64 + 1
+        keys = array('Q', rng.getrandbits(64 * num_keys).to_bytes(8 * num_keys, 'little'))
+        if sys.byteorder == 'big':
+            keys.byteswap()
+        keys = keys.tolist()
         
-        # Generate keys for each piece on each square
-        for square in range(64):
-            for piece_type in range(1, 7):  # PAWN=1, KNIGHT=2, ..., KING=6
-                for color in [chess.WHITE, chess.BLACK]:
-                    piece = chess.Piece(piece_type, color)
-                    keys[(square, piece)] = rng.getrandbits(64)
+        # Keys for each piece on each square
+        self.piece_keys = keys[:12 * 64]
         
-        # Generate keys for castling rights
-        keys['castling_K'] = rng.getrandbits(64)
-        keys['castling_Q'] = rng.getrandbits(64)
-        keys['castling_k'] = rng.getrandbits(64)
-        keys['castling_q'] = rng.getrandbits(64)
+        # Keys for castling rights
+        self.castling_K_key, self.castling_Q_key, self.castling_k_key, self.castling_q_key = keys[12 * 64:12 * 64 + 4]
         
-        # Generate keys for en passant squares
-        for square in range(64):
-            keys[('ep', square)] = rng.getrandbits(64)
+        # Keys for en passant squares
+        self.ep_keys = keys[12 * 64 + 4:12 * 64 + 4 + 64]
         
-        # Generate a key for side to move
-        keys['side_to_move'] = rng.getrandbits(64)
+        # Key for side to move
+        self.side_to_move_key = keys[-1]
         
-        return keys
+        # Combined castling key for each subset of the four castling rights,
+        # indexed by K=1, Q=2, k=4, q=8
+        castling_keys = (self.castling_K_key, self.castling_Q_key,
+                         self.castling_k_key, self.castling_q_key)
+        self.castling_table = [0] * 16
+        for index in range(16):
+            for bit, key in enumerate(castling_keys):
+                if index & (1 << bit):
+                    self.castling_table[index] ^= key
     
     def compute_hash(self, board):
         """
@@ -75,33 +96,111 @@ class TranspositionTable:
             A 64-bit hash value for the position
         """
         h = 0
+        piece_keys = self.piece_keys
         
-        # Hash pieces
-        for square in range(64):
-            piece = board.piece_at(square)
-            if piece:
-                h ^= self.zobrist_keys[(square, piece)]
-        
-        # Hash castling rights
-        if board.has_kingside_castling_rights(chess.WHITE):
-            h ^= self.zobrist_keys['castling_K']
-        if board.has_queenside_castling_rights(chess.WHITE):
-            h ^= self.zobrist_keys['castling_Q']
-        if board.has_kingside_castling_rights(chess.BLACK):
-            h ^= self.zobrist_keys['castling_k']
-        if board.has_queenside_castling_rights(chess.BLACK):
-            h ^= self.zobrist_keys['castling_q']
+        # Hash pieces by scanning the set bits of each piece bitboard. The bits
+        # are popped inline (lowest set bit first) rather than through
+        # chess.scan_forward, which saves a generator per bitboard.
+        white = board.occupied_co[chess.WHITE]
+        piece_bitboards = (board.pawns, board.knights, board.bishops,
+                           board.rooks, board.queens, board.kings)
+        for piece_index, bitboard in enumerate(piece_bitboards):
+            # White keys start at index 6 * 64, black keys at 0
+            for index, color_mask in ((384 + piece_index * 64, white), (piece_index * 64, ~white)):
+                pieces = bitboard & color_mask
+                while pieces:
+                    h ^= piece_keys[index + (pieces & -pieces).bit_length() - 1]
+                    pieces &= pieces - 1
+        
+        # Hash castling rights. In standard chess the rights are the rook
+        # squares a1, h1, a8 and h8, which index a table of combined keys.
+        castling_rights = board.clean_castling_rights()
+        if castling_rights:
+            if board.chess960:
+                if board.has_kingside_castling_rights(chess.WHITE):
+                    h ^= self.castling_K_key
+                if board.has_queenside_castling_rights(chess.WHITE):
+                    h ^= self.castling_Q_key
+                if board.has_kingside_castling_rights(chess.BLACK):
+                    h ^= self.castling_k_key
+                if board.has_queenside_castling_rights(chess.BLACK):
+                    h ^= self.castling_q_key
+            else:
+                h ^= self.castling_table[
+                    bool(castling_rights & chess.BB_H1)
+                    | bool(castling_rights & chess.BB_A1) << 1
+                    | bool(castling_rights & chess.BB_H8) << 2
+                    | bool(castling_rights & chess.BB_A8) << 3
+                ]
         
         # Hash en passant square
         if board.ep_square is not None:
-            h ^= self.zobrist_keys[('ep', board.ep_square)]
+            h ^= self.ep_keys[board.ep_square]
         
         # Hash side to move
         if board.turn == chess.BLACK:
-            h ^= self.zobrist_keys['side_to_move']
+            h ^= self.side_to_move_key
         
         return h
-    
+
+    def hash_after_move(self, board_hash, board, move):
+        """
+        Update a Zobrist hash for a move without rehashing the whole board.
+
+        Only the keys of the squares the move touches are XORed in and out.
+        Must be called before the move is pushed on the board.
+
+        Args:
+            board_hash: The hash of the current position (see compute_hash)
+            board: A chess.Board object in the position before the move
+            move: A legal move on the board, or chess.Move.null()
+
+        Returns:
+            The hash of the position after the move, or None if the move changes
+            castling rights, in which case compute_hash must be used instead
+        """
+        piece_keys = self.piece_keys
+
+        # Flip the side to move and remove the current en passant square
+        h = board_hash ^ self.side_to_move_key
+        ep_square = board.ep_square
+        if ep_square is not None:
+            h ^= self.ep_keys[ep_square]
+
+        # A null move only passes the turn
+        if not move:
+            return h
+
+        from_square = move.from_square
+        to_square = move.to_square
+        piece_type = board.piece_type_at(from_square)
+
+        # Castling rights are rarely touched; leave those moves to a full rehash
+        castling_rights = board.castling_rights
+        if castling_rights and (piece_type == chess.KING or
+                                castling_rights & (chess.BB_SQUARES[from_square] | chess.BB_SQUARES[to_square])):
+            return None
+
+        # Move the piece, replacing it with the promotion piece if any
+        index = board.turn * 6 * 64
+        h ^= piece_keys[index + (piece_type - 1) * 64 + from_square]
+        h ^= piece_keys[index + ((move.promotion or piece_type) - 1) * 64 + to_square]
+
+        # Remove a captured piece
+        captured = board.piece_type_at(to_square)
+        if captured:
+            h ^= piece_keys[(not board.turn) * 6 * 64 + (captured - 1) * 64 + to_square]
+        elif piece_type == chess.PAWN:
+            if to_square == ep_square and chess.square_file(to_square) != chess.square_file(from_square):
+                # En passant capture: the captured pawn is behind the target square
+                captured_square = to_square - 8 if board.turn == chess.WHITE else to_square + 8
+                h ^= piece_keys[(not board.turn) * 6 * 64 + captured_square]
+            elif abs(to_square - from_square) == 16:
+                # A double pawn push sets the en passant square
+                h ^= self.ep_keys[(from_square + to_square) // 2]
+
+        return h
+
     def get(self, board, depth=None):
         """
         Get an evaluation from the transposition table.
@@ -113,17 +212,30 @@ class TranspositionTable:
         Returns:
             A tuple (hit, entry) where:
             - hit is a boolean indicating if the position was found
-            - entry is the stored data or None if not found
+            - entry is a (board_hash, data, depth, generation) tuple or None if not found
+        """
+        return self.get_by_key(self.compute_hash(board), depth)
+    
+    def get_by_key(self, board_hash, depth=None):
         """
-        board_hash = self.compute_hash(board)
+        Get an evaluation from the transposition table by its Zobrist hash.
         
-        if board_hash in self.table:
-            entry = self.table[board_hash]
+        Lets callers that already computed the hash of a position avoid
+        hashing the board again.
+        
+        Args:
+            board_hash: The Zobrist hash of the position (see compute_hash)
+            depth: The search depth (if None, any depth will match)
             
+        Returns:
+            A tuple (hit, entry) as returned by get
+        """
+        entry = self.table[board_hash & self.mask]
+        
+        # The slot may hold a different position with the same low bits
+        if entry is not None and entry[0] == board_hash:
             # If depth is specified, check if the stored entry is deep enough
-            if depth is None or entry['depth'] >= depth:
-                # Move the entry to the end of the OrderedDict (most recently used)
-                self.table.move_to_end(board_hash)
+            if depth is None or entry[2] >= depth:
                 self.hits += 1
                 return True, entry
         
@@ -139,36 +251,71 @@ class TranspositionTable:
             data: The data to store (typically evaluation and best move)
             depth: The search depth used to obtain this evaluation
         """
-        board_hash = self.compute_hash(board)
-        
-        # Check if we're replacing an existing entry
-        if board_hash in self.table:
-            # Only replace if the new entry is from a deeper search
-            if self.table[board_hash]['depth'] <= depth:
-                self.table[board_hash] = {
-                    'data': data,
-                    'depth': depth,
-                    'timestamp': time.time()
-                }
-                # Move to the end (most recently used)
-                self.table.move_to_end(board_hash)
-            else:
-                self.collisions += 1
-        else:
-            # Add new entry
-            self.table[board_hash] = {
-                'data': data,
-                'depth': depth,
-                'timestamp': time.time()
-            }
+        self.put_by_key(self.compute_hash(board), data, depth)
+    
+    def put_by_key(self, board_hash, data, depth):
+        """
+        Store an evaluation in the transposition table by its Zobrist hash.
+        
+        Args:
+            board_hash: The Zobrist hash of the position (see compute_hash)
+            data: The data to store (typically evaluation and best move)
+            depth: The search depth used to obtain this evaluation
+        """
+        index = board_hash & self.mask
+        entry = self.table[index]
+        
+        if entry is None:
+            self.size += 1
+        elif entry[2] > depth and entry[3] == self.generation:
+            # Only replace an entry from the current search with one from an
+            # equal or deeper search
+            self.collisions += 1
+            return
+        
+        self.table[index] = (board_hash, data, depth, self.generation)
+    
+    def put_if_absent(self, board_hash, data, depth):
+        """
+        Store an evaluation by its Zobrist hash unless the position is already stored.
+        
+        Useful for deterministic evaluations, where an existing entry can never
+        be improved upon and rewriting it is wasted work.
+        
+        Args:
+            board_hash: The Zobrist hash of the position (see compute_hash)
+            data: The data to store
+            depth: The search depth used to obtain this evaluation
             
-            # If table is full, remove the least recently used entry
-            if len(self.table) > self.max_size:
-                self.table.popitem(last=False)
+        Returns:
+            True if the entry was stored, False if the position was already
+            present or its slot holds a deeper entry from the current search
+        """
+        index = board_hash & self.mask
+        entry = self.table[index]
+        
+        if entry is None:
+            self.size += 1
+        elif entry[0] == board_hash or (entry[2] > depth and entry[3] == self.generation):
+            return False
+        
+        self.table[index] = (board_hash, data, depth, self.generation)
+        return True
+    
+    def new_search(self):
+        """
+        Start a new generation of entries.
+        
+        Entries from earlier searches remain readable, but may be replaced by
+        any new entry regardless of depth, so stale deep results do not
+        occupy their slots forever.
+        """
+        self.generation += 1
     
     def clear(self):
         """Clear the transposition table."""
-        self.table.clear()
+        self.table = [None] * self.num_slots
+        self.size = 0
         self.hits = 0
         self.misses = 0
         self.collisions = 0
@@ -184,9 +331,9 @@ class TranspositionTable:
         hit_rate = (self.hits / total_lookups) * 100 if total_lookups > 0 else 0
         
         return {
-            'size': len(self.table),
-            'max_size': self.max_size,
-            'usage': f"{len(self.table) / self.max_size * 100:.2f}%",
+            'size': self.size,
+            'max_size': self.num_slots,
+            'usage': f"{self.size / self.num_slots * 100:.2f}%",
             'hits': self.hits,
             'misses': self.misses,
             'hit_rate': f"{hit_rate:.2f}%",
@@ -5,10 +5,14 @@ This module handles rendering the analysis panel.
 
 import pygame
 import chess
+from collections import OrderedDict
 from chess_ai.config.settings import (
     WIDTH, HEIGHT, ANALYSIS_PANEL_HEIGHT, ANALYSIS_PANEL_COLOR, ANALYSIS_TEXT_COLOR
 )
 
+# Maximum number of rendered text surfaces kept in the cache
+TEXT_CACHE_SIZE = 128
+
 class AnalysisPanel:
     """Class for rendering the analysis panel."""
 
@@ -23,8 +27,8 @@ class AnalysisPanel:
         self.font = pygame.font.SysFont("Courier New", 14)
         self.info_font = pygame.font.SysFont("Arial", 12)
 
-        # Cache for rendered text and surfaces
-        self.text_cache = {}
+        # Cache for rendered text (least recently used first) and surfaces
+        self.text_cache = OrderedDict()
         self.surface_cache = {}
 
         # Cache the panel background
@@ -35,6 +39,16 @@ class AnalysisPanel:
         self.last_eval_text = None
         self.last_eval_color = None
 
+        # Game state line for the last rendered position; the draw claim
+        # checks walk the move stack, so they only run when the position changes
+        self._state_cache_key = None
+        self._state_cache_val = None
+
+        # Copy of the last rendered panel and the state it was rendered from,
+        # so an unchanged panel is drawn with a single blit
+        self._panel_composite = None
+        self._panel_key = None
+
     def _create_panel_background(self):
         """
         Create and cache the panel background surface.
@@ -51,6 +65,12 @@ class AnalysisPanel:
         bar_bg.fill((50, 50, 50))  # Dark gray
         self.surface_cache['bar_bg'] = bar_bg
 
+        # Create the white portion of the evaluation bar, of which only the
+        # part matching the evaluation is drawn
+        bar_fill = pygame.Surface((bar_width, bar_height))
+        bar_fill.fill((200, 200, 200))  # Light gray
+        self.surface_cache['bar_fill'] = bar_fill
+
     def _get_cached_text(self, text, color, font):
         """
         Get cached text surface or create and cache a new one.
@@ -63,25 +83,84 @@ class AnalysisPanel:
         Returns:
             A rendered text surface
         """
-        cache_key = f"{text}_{color[0]}_{color[1]}_{color[2]}_{id(font)}"
-        if cache_key not in self.text_cache:
-            self.text_cache[cache_key] = font.render(text, True, color)
-        return self.text_cache[cache_key]
+        cache_key = (text, color, id(font))
+        surface = self.text_cache.get(cache_key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.text_cache[cache_key] = surface
+            # Evict the least recently used text once the cache is full
+            if len(self.text_cache) > TEXT_CACHE_SIZE:
+                self.text_cache.popitem(last=False)
+        else:
+            self.text_cache.move_to_end(cache_key)
+        return surface
+
+    def _get_state_info(self, board):
+        """
+        Get the game state line (check, stalemate or draw) for a position.
+
+        The result is cached until the position changes.
 
-    def render(self, board, engine):
+        Args:
+            board: A chess.Board object representing the current position.
+
+        Returns:
+            A tuple (state_info, state_color); state_info is empty if there is
+            nothing to report
+        """
+        move_stack = board.move_stack
+        key = (len(move_stack), move_stack[-1] if move_stack else None,
+               board.occupied, board.halfmove_clock)
+        if key == self._state_cache_key:
+            return self._state_cache_val
+
+        if board.is_check():
+            state_info = "CHECK!"
+            state_color = (200, 50, 50)  # Red for check
+        elif board.is_stalemate():
+            state_info = "Stalemate"
+            state_color = (200, 200, 50)  # Yellow for stalemate
+        elif board.is_insufficient_material():
+            state_info = "Draw (insufficient material)"
+            state_color = (200, 200, 50)  # Yellow for draw
+        elif board.can_claim_fifty_moves():
+            state_info = "Draw (50-move rule)"
+            state_color = (200, 200, 50)  # Yellow for draw
+        elif board.can_claim_threefold_repetition():
+            state_info = "Draw (repetition)"
+            state_color = (200, 200, 50)  # Yellow for draw
+        else:
+            state_info = ""
+            state_color = ANALYSIS_TEXT_COLOR
+
+        self._state_cache_key = key
+        self._state_cache_val = (state_info, state_color)
+        return self._state_cache_val
+
+    def render(self, board, engine, evaluate=True):
         """
         Render the analysis panel.
 
         Args:
             board: A chess.Board object representing the current position.
             engine: The chess engine object.
+            evaluate: Whether to ask the engine for an evaluation; the
+                evaluation is left out while the engine is searching.
         """
         try:
+            eval_data = engine.get_board_evaluation(board) if evaluate else None
+
+            # Reuse the last rendered panel if nothing it shows has changed
+            thinking_lines = tuple(engine.thinking_lines[:3]) if hasattr(engine, 'thinking_lines') else ()
+            panel_key = (board.fen(), thinking_lines, tuple(eval_data.items()) if eval_data else None)
+            if panel_key == self._panel_key and self._panel_composite is not None:
+                self.screen.blit(self._panel_composite, (0, HEIGHT))
+                return
+
             # Draw the analysis panel background from cache
             self.screen.blit(self.surface_cache['panel_bg'], (0, HEIGHT))
 
             # Draw the evaluation
-            eval_data = engine.get_board_evaluation(board)
             if eval_data:
                 eval_type = eval_data.get('type')
                 value = eval_data.get('value', 0)
@@ -122,8 +201,8 @@ class AnalysisPanel:
                     bar_x = 50
                     bar_y = HEIGHT + (ANALYSIS_PANEL_HEIGHT - bar_height) // 2
 
-                    # Draw the background
-                    pygame.draw.rect(self.screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
+                    # Draw the background, which also serves as the black portion
+                    self.screen.blit(self.surface_cache['bar_bg'], (bar_x, bar_y))
 
                     # Calculate the bar fill based on evaluation
                     # Clamp the evaluation between -5 and 5 pawns
@@ -134,9 +213,9 @@ class AnalysisPanel:
                     white_height = int(bar_height * normalized_eval)
                     black_height = bar_height - white_height
 
-                    # Draw the white and black portions
-                    pygame.draw.rect(self.screen, (200, 200, 200), (bar_x, bar_y + black_height, bar_width, white_height))
-                    pygame.draw.rect(self.screen, (50, 50, 50), (bar_x, bar_y, bar_width, black_height))
+                    # Draw the white portion from the pre-rendered fill
+                    self.screen.blit(self.surface_cache['bar_fill'], (bar_x, bar_y + black_height),
+                                     (0, 0, bar_width, white_height))
 
                 elif eval_type == 'mate':
                     # Format the mate evaluation string
@@ -148,52 +227,39 @@ class AnalysisPanel:
                         eval_color = (200, 50, 50)  # Red for getting checkmated
 
                     # Draw the evaluation
-                    eval_text = self.font.render(eval_str, True, eval_color)
+                    eval_text = self._get_cached_text(eval_str, eval_color, self.font)
                     self.screen.blit(eval_text, (10, HEIGHT + 10))
 
             # Draw the thinking lines
             if hasattr(engine, 'thinking_lines'):
                 y_offset = 30
                 for i, line in enumerate(engine.thinking_lines[:3]):
-                    line_text = self.font.render(line, True, ANALYSIS_TEXT_COLOR)
+                    line_text = self._get_cached_text(line, ANALYSIS_TEXT_COLOR, self.font)
                     self.screen.blit(line_text, (80, HEIGHT + y_offset + i * 20))
 
             # Draw current position information
             position_info = f"Move: {1 + board.fullmove_number//2}{'.' if board.turn == chess.WHITE else '...'}"
-            position_surface = self.info_font.render(position_info, True, ANALYSIS_TEXT_COLOR)
+            position_surface = self._get_cached_text(position_info, ANALYSIS_TEXT_COLOR, self.info_font)
             self.screen.blit(position_surface, (WIDTH - 120, HEIGHT + 8))
 
             # Draw whose turn it is
             turn_info = "White to move" if board.turn == chess.WHITE else "Black to move"
-            turn_surface = self.info_font.render(turn_info, True, ANALYSIS_TEXT_COLOR)
+            turn_surface = self._get_cached_text(turn_info, ANALYSIS_TEXT_COLOR, self.info_font)
             self.screen.blit(turn_surface, (WIDTH - 120, HEIGHT + 28))
 
             # Draw game state information
-            if board.is_check():
-                state_info = "CHECK!"
-                state_color = (200, 50, 50)  # Red for check
-            elif board.is_stalemate():
-                state_info = "Stalemate"
-                state_color = (200, 200, 50)  # Yellow for stalemate
-            elif board.is_insufficient_material():
-                state_info = "Draw (insufficient material)"
-                state_color = (200, 200, 50)  # Yellow for draw
-            elif board.can_claim_fifty_moves():
-                state_info = "Draw (50-move rule)"
-                state_color = (200, 200, 50)  # Yellow for draw
-            elif board.can_claim_threefold_repetition():
-                state_info = "Draw (repetition)"
-                state_color = (200, 200, 50)  # Yellow for draw
-            else:
-                state_info = ""
-                state_color = ANALYSIS_TEXT_COLOR
-
+            state_info, state_color = self._get_state_info(board)
             if state_info:
-                state_surface = self.info_font.render(state_info, True, state_color)
+                state_surface = self._get_cached_text(state_info, state_color, self.info_font)
                 self.screen.blit(state_surface, (WIDTH - 120, HEIGHT + 48))
 
+            # Keep a copy of the finished panel for the following frames
+            self._panel_composite = self.screen.subsurface((0, HEIGHT, WIDTH, ANALYSIS_PANEL_HEIGHT)).copy()
+            self._panel_key = panel_key
+
         except Exception as e:
             # If there's a critical error in the analysis panel, log it but don't crash
             print(f"Error displaying analysis panel: {e}")
+            self._panel_key = None
             error_text = self.info_font.render("Error displaying analysis", True, (200, 50, 50))
             self.screen.blit(error_text, (10, HEIGHT + 10))
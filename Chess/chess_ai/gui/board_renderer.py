@@ -7,8 +7,9 @@ import pygame
 import chess
 from chess_ai.config.settings import (
     WIDTH, HEIGHT, BOARD_SIZE, BOARD_OFFSET_X, BOARD_OFFSET_Y,
-    DARK_SQUARE, LIGHT_SQUARE, HIGHLIGHT_COLOR
+    DARK_SQUARE, LIGHT_SQUARE, HIGHLIGHT_COLOR, BACKGROUND_COLOR
 )
+from chess_ai.utils.helpers import GameResult
 
 class BoardRenderer:
     """Class for rendering the chess board and pieces."""
@@ -31,6 +32,22 @@ class BoardRenderer:
         # Pre-calculate square surfaces for better performance
         self._initialize_square_surfaces()
 
+        # Create fonts once; SysFont loads the font file on every call
+        square_size = BOARD_SIZE // 8
+        self.coord_font = pygame.font.SysFont("Arial", 14)
+        self.fallback_font = pygame.font.SysFont("Arial", square_size // 2)
+        self.result_font = pygame.font.SysFont("Arial", 48, bold=True)
+        self.restart_font = pygame.font.SysFont("Arial", 24)
+
+        # Pre-render the coordinate labels; the result overlays are rendered
+        # on first use
+        self.coordinate_labels = self._render_coordinate_labels()
+        self.result_cache = {}
+
+        # The window background, squares and coordinates never change, so they
+        # are drawn once into a surface that is copied to the screen per frame
+        self.background = self._render_background()
+
     def _load_piece_images(self):
         """Load chess piece images."""
         piece_types = ['p', 'n', 'b', 'r', 'q', 'k']
@@ -78,9 +95,48 @@ class BoardRenderer:
         highlight.fill(HIGHLIGHT_COLOR)
         self.highlight_surface = highlight
 
+        # Screen position, chess square and square color of every board square,
+        # in drawing order (top row first)
+        self._square_coords = []
+        for row in range(8):
+            for col in range(8):
+                x = BOARD_OFFSET_X + col * square_size
+                y = BOARD_OFFSET_Y + row * square_size
+                square = chess.square(col, 7 - row)
+                self._square_coords.append((x, y, square, (row + col) % 2 == 0))
+
+    def _render_background(self):
+        """
+        Render the static part of the screen.
+
+        Returns:
+            A surface the size of the screen with the background color, the
+            empty board squares and the coordinate labels
+        """
+        # Match the screen's pixel format so blitting needs no conversion
+        background = pygame.Surface(self.screen.get_size(), 0, self.screen)
+        background.fill(BACKGROUND_COLOR)
+
+        light_surface = self.square_surfaces['light']
+        dark_surface = self.square_surfaces['dark']
+        for x, y, _, is_light in self._square_coords:
+            background.blit(light_surface if is_light else dark_surface, (x, y))
+
+        for text, position in self.coordinate_labels:
+            background.blit(text, position)
+
+        return background
+
+    def render_background(self):
+        """Render the window background, the empty board and its coordinates."""
+        self.screen.blit(self.background, (0, 0))
+
     def render_board(self, board, selected_square=None):
         """
-        Render the chess board and pieces.
+        Render the highlights and pieces on the board.
+
+        The squares themselves are part of the background (see
+        render_background), which must be drawn first.
 
         Args:
             board: A chess.Board object representing the current position.
@@ -91,112 +147,125 @@ class BoardRenderer:
         # Pre-calculate legal moves for the selected square (if any)
         legal_moves_from_selected = set()
         if selected_square is not None:
-            legal_moves_from_selected = {move.to_square for move in board.legal_moves
-                                       if move.from_square == selected_square}
-
-        # Draw the board with cached surfaces
-        for row in range(8):
-            for col in range(8):
-                # Determine square color
-                is_light = (row + col) % 2 == 0
-                square_type = 'light' if is_light else 'dark'
-
-                # Get position
-                x = BOARD_OFFSET_X + col * square_size
-                y = BOARD_OFFSET_Y + row * square_size
-
-                # Draw the square from cache
-                self.screen.blit(self.square_surfaces[square_type], (x, y))
-
-                # Get chess square
-                square = chess.square(col, 7 - row)
-
-                # Highlight selected square
-                if selected_square is not None and square == selected_square:
-                    self.screen.blit(self.highlight_surface, (x, y))
-
-                # Highlight legal moves from selected square
-                elif square in legal_moves_from_selected:
-                    self.screen.blit(self.highlight_surface, (x, y))
-
-        # Draw the pieces
-        for row in range(8):
-            for col in range(8):
-                square = chess.square(col, 7 - row)
-                piece = board.piece_at(square)
-                if piece:
-                    piece_symbol = piece.symbol()
-                    x = BOARD_OFFSET_X + col * square_size
-                    y = BOARD_OFFSET_Y + row * square_size
-
-                    if piece_symbol in self.piece_images:
-                        # Draw the piece image
-                        self.screen.blit(self.piece_images[piece_symbol], (x, y))
-                    else:
-                        # Draw a text representation as fallback
-                        font = pygame.font.SysFont("Arial", square_size // 2)
-                        text = font.render(piece_symbol, True, (255, 255, 255) if piece_symbol.islower() else (0, 0, 0))
-                        text_rect = text.get_rect(center=(x + square_size // 2, y + square_size // 2))
-                        self.screen.blit(text, text_rect)
+            # Only generate the moves of the selected piece
+            legal_moves_from_selected = {move.to_square for move in
+                                         board.generate_legal_moves(from_mask=chess.BB_SQUARES[selected_square])}
+
+        piece_map = board.piece_map()
+
+        # Draw each highlight and piece in a single pass, using precomputed
+        # coordinates
+        for x, y, square, _ in self._square_coords:
+            # Highlight selected square
+            if selected_square is not None and square == selected_square:
+                self.screen.blit(self.highlight_surface, (x, y))
+
+            # Highlight legal moves from selected square
+            elif square in legal_moves_from_selected:
+                self.screen.blit(self.highlight_surface, (x, y))
+
+            # Draw the piece on the square, if any
+            piece = piece_map.get(square)
+            if piece:
+                piece_symbol = piece.symbol()
+
+                if piece_symbol in self.piece_images:
+                    # Draw the piece image
+                    self.screen.blit(self.piece_images[piece_symbol], (x, y))
+                else:
+                    # Draw a text representation as fallback
+                    text = self.fallback_font.render(piece_symbol, True, (255, 255, 255) if piece_symbol.islower() else (0, 0, 0))
+                    text_rect = text.get_rect(center=(x + square_size // 2, y + square_size // 2))
+                    self.screen.blit(text, text_rect)
+
+    def _render_coordinate_labels(self):
+        """
+        Render the board coordinate labels.
 
-    def render_coordinates(self):
-        """Render board coordinates (files and ranks)."""
-        font = pygame.font.SysFont("Arial", 14)
+        Returns:
+            A list of (surface, position) pairs for the file and rank labels
+        """
+        font = self.coord_font
         square_size = BOARD_SIZE // 8
+        labels = []
 
-        # Draw file coordinates (a-h)
+        # File coordinates (a-h)
         for col in range(8):
             file_label = chr(ord('a') + col)
             text = font.render(file_label, True, (200, 200, 200))
-            self.screen.blit(
+            labels.append((
                 text,
                 (
                     BOARD_OFFSET_X + col * square_size + square_size // 2 - text.get_width() // 2,
                     BOARD_OFFSET_Y + BOARD_SIZE + 5
                 )
-            )
+            ))
 
-        # Draw rank coordinates (1-8)
+        # Rank coordinates (1-8)
         for row in range(8):
             rank_label = str(8 - row)
             text = font.render(rank_label, True, (200, 200, 200))
-            self.screen.blit(
+            labels.append((
                 text,
                 (
                     BOARD_OFFSET_X - 15,
                     BOARD_OFFSET_Y + row * square_size + square_size // 2 - text.get_height() // 2
                 )
-            )
+            ))
 
-    def render_game_result(self, result):
+        return labels
+
+    def render_coordinates(self):
+        """Render board coordinates (files and ranks)."""
+        for text, position in self.coordinate_labels:
+            self.screen.blit(text, position)
+
+    def _render_result_surfaces(self, result):
         """
-        Render the game result overlay.
+        Render the surfaces of a game result overlay.
 
         Args:
-            result: A string representing the game result ('1-0', '0-1', '1/2-1/2').
-        """
-        if not result:
-            return
+            result: A GameResult.
 
+        Returns:
+            A list of (surface, position) pairs to draw in order
+        """
         # Create a semi-transparent overlay
         overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 180))  # Black with 70% opacity
-        self.screen.blit(overlay, (0, 0))
 
         # Render the result text
-        font = pygame.font.SysFont("Arial", 48, bold=True)
-        if result == "1-0":
+        font = self.result_font
+        if result == GameResult.WHITE_WIN:
             text = font.render("White wins!", True, (255, 255, 255))
-        elif result == "0-1":
+        elif result == GameResult.BLACK_WIN:
             text = font.render("Black wins!", True, (255, 255, 255))
-        else:  # 1/2-1/2
+        else:  # Draw
             text = font.render("Draw!", True, (255, 255, 255))
-
         text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 30))
-        self.screen.blit(text, text_rect)
 
         # Render instructions to restart
-        font_small = pygame.font.SysFont("Arial", 24)
-        restart_text = font_small.render("Press 'R' to restart", True, (200, 200, 200))
+        restart_text = self.restart_font.render("Press 'R' to restart", True, (200, 200, 200))
         restart_rect = restart_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 30))
-        self.screen.blit(restart_text, restart_rect)
+
+        return [(overlay, (0, 0)), (text, text_rect), (restart_text, restart_rect)]
+
+    def render_game_result(self, result):
+        """
+        Render the game result overlay.
+
+        Args:
+            result: A GameResult, or None to draw nothing.
+        """
+        # GameResult.DRAW is 0, so compare with None rather than test truth
+        if result is None:
+            return
+
+        # Each of the possible results is only rendered once
+        surfaces = self.result_cache.get(result)
+        if surfaces is None:
+            surfaces = self._render_result_surfaces(result)
+            self.result_cache[result] = surfaces
+
+        for surface, position in surfaces:
+            self.screen.blit(surface, position)
@@ -5,18 +5,37 @@ This module contains the main GUI application for the chess game.
 
 import pygame
 import chess
+import chess.polyglot
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from chess_ai.config.settings import (
     WIDTH, HEIGHT, BOARD_SIZE, BOARD_OFFSET_X, BOARD_OFFSET_Y,
-    FPS, BACKGROUND_COLOR, ANALYSIS_PANEL_HEIGHT, SHOW_ANALYSIS
+    FPS, ANALYSIS_PANEL_HEIGHT, SHOW_ANALYSIS
 )
 from chess_ai.engine.sunfish_wrapper import SunfishWrapper, EngineInitializationError
 from chess_ai.engine.fallback_engine import FallbackEngine
 from chess_ai.gui.board_renderer import BoardRenderer
 from chess_ai.gui.analysis_panel import AnalysisPanel
-from chess_ai.utils.helpers import get_square_from_pos, check_game_over, make_random_move
+from chess_ai.utils.helpers import get_square_from_pos, check_game_over, make_random_move, GameResult
+
+# The only event types the main loop reacts to. Everything else (mouse motion,
+# key releases, other window events) is blocked so it never reaches the Python
+# queue. VIDEOEXPOSE only triggers a redraw when the window is uncovered.
+HANDLED_EVENTS = [pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.VIDEOEXPOSE]
+
+# Game results as scored by the engine's learning system
+LEARNING_RESULTS = {GameResult.WHITE_WIN: 1.0, GameResult.DRAW: 0.5, GameResult.BLACK_WIN: 0.0}
+
+# Opening styles selected with Ctrl and a number key
+OPENING_STYLE_KEYS = {1: 'solid', 2: 'aggressive', 3: 'tricky', 4: 'balanced'}
+
+# Keys that change or query the engine, ignored while it searches on the
+# worker thread. The number keys 1-9 (difficulty and opening style) are
+# ignored as well.
+ENGINE_KEYS = frozenset((pygame.K_b, pygame.K_c, pygame.K_x, pygame.K_q,
+                         pygame.K_n, pygame.K_l, pygame.K_p, pygame.K_o))
 
 class ChessApp:
     """Main chess application class."""
@@ -25,32 +44,64 @@ class ChessApp:
         """Initialize the chess application."""
         # Initialize pygame
         pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT + ANALYSIS_PANEL_HEIGHT if SHOW_ANALYSIS else 0))
+        # The window always has room for the analysis panel, so toggling the
+        # panel never has to recreate it; a hidden panel leaves the area blank
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT + ANALYSIS_PANEL_HEIGHT))
         pygame.display.set_caption("Chess AI")
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(HANDLED_EVENTS)
+        pygame.event.clear()  # Drop events queued during initialization
         self.clock = pygame.time.Clock()
 
         # Initialize the chess board
         self.board = chess.Board()
 
+        # Zobrist hash of every position in the game, the current one last,
+        # kept in step with the move stack to detect repetitions cheaply
+        self.position_hashes = [chess.polyglot.zobrist_hash(self.board)]
+
         # Initialize the renderers
         self.board_renderer = BoardRenderer(self.screen)
         self.analysis_panel = AnalysisPanel(self.screen)
 
         # Game state variables
         self.selected_square = None
+        self.selected_piece = None  # The piece on the selected square
         self.player_color = chess.WHITE  # Player plays as white by default
         self.game_over = False
         self.game_result = None
+        self.show_analysis = SHOW_ANALYSIS  # Whether the analysis panel is drawn
 
-        # Move history for undo/redo functionality
-        self.move_history = []  # List of moves made
-        self.current_move_index = -1  # Index of the current move in history
+        # Undo pops moves off the board's move stack; they are kept here for redo
         self.redone_moves = []  # List of moves that were undone and can be redone
 
         # Performance optimization variables
         self.needs_redraw = True  # Flag to indicate if the screen needs to be redrawn
-        self.last_board_state = None  # Store the last board state to detect changes
-        self.frame_count = 0  # Count frames for limiting updates
+        self.last_board_state = None  # Store the last drawn state to detect changes
+
+        # The engine searches on a worker thread so the GUI stays responsive
+        self.ai_executor = ThreadPoolExecutor(max_workers=1)
+        self.ai_future = None  # Pending engine move, if the engine is thinking
+        self.ai_position = None  # (ply, Zobrist hash) of the position being searched
+
+        # Actions for each key, looked up once per key press
+        self.key_handlers = {
+            pygame.K_r: self.reset_game,
+            pygame.K_s: self.switch_sides,
+            pygame.K_a: self.toggle_analysis,
+            pygame.K_b: self.toggle_opening_book,
+            pygame.K_c: self.toggle_transposition_table,
+            pygame.K_x: self.toggle_alpha_beta,
+            pygame.K_q: self.toggle_quiescence,
+            pygame.K_n: self.toggle_null_move,
+            pygame.K_l: self.toggle_learning,
+            pygame.K_p: self.toggle_positional_eval,
+            pygame.K_o: self.show_opening_stats,
+            pygame.K_z: self.handle_undo_key,
+            pygame.K_LEFT: self.handle_undo_key,
+            pygame.K_y: self.handle_redo_key,
+            pygame.K_RIGHT: self.handle_redo_key,
+        }
 
         # Initialize the engine
         self.initialize_engine()
@@ -89,42 +140,96 @@ class ChessApp:
             self.engine = FallbackEngine()
 
     def make_ai_move(self):
-        """Make a move with the chess engine, handling any errors gracefully."""
-        if not self.board.is_game_over():
-            try:
-                if self.engine.is_initialized:
-                    # This will also populate the thinking lines and evaluation
-                    ai_move = self.engine.get_best_move(self.board)
-                    if ai_move:
-                        # Print engine's thinking to console
-                        print("\nEngine analysis:")
-                        for line in self.engine.thinking_lines:
-                            print(f"  {line}")
-                        if self.engine.last_evaluation:
-                            eval_type = self.engine.last_evaluation['type']
-                            value = self.engine.last_evaluation['value']
-                            if eval_type == 'cp':
-                                print(f"  Overall evaluation: {value/100:.2f} pawns")
-                            else:  # mate
-                                print(f"  Overall evaluation: Mate in {value}")
-                        print(f"  Best move: {ai_move}\n")
-
-                        # Make the move
-                        self.board.push_uci(ai_move)
-                    else:
-                        # If no move was returned, make a random move
-                        make_random_move(self.board)
-                else:
-                    # If engine is not available, make a random legal move
-                    make_random_move(self.board)
-            except Exception as e:
-                # Handle any errors during AI move generation
-                print(f"Error during AI move generation: {e}")
+        """
+        Start the engine's move on a background thread.
+
+        The engine searches a copy of the board, so the GUI keeps drawing while
+        it thinks. The move is played by finish_ai_move once it is ready.
+        """
+        if self.board.is_game_over() or self.ai_future is not None:
+            return
+
+        if self.engine.is_initialized:
+            self.ai_position = (len(self.board.move_stack), chess.polyglot.zobrist_hash(self.board))
+            self.ai_future = self.ai_executor.submit(self.engine.get_best_move, self.board.copy())
+        else:
+            # If engine is not available, make a random legal move
+            make_random_move(self.board)
+            self.check_game_over()
+
+    def finish_ai_move(self):
+        """Play the engine's move if its background search has finished."""
+        if self.ai_future is None or not self.ai_future.done():
+            return
+
+        future = self.ai_future
+        self.ai_future = None
+
+        # Only play the move in the position it was searched for
+        if self.ai_position != (len(self.board.move_stack), chess.polyglot.zobrist_hash(self.board)):
+            return
+
+        try:
+            # This will also have populated the thinking lines and evaluation
+            ai_move = future.result()
+            if ai_move:
+                # Print engine's thinking to console in a single write
+                report = ["\nEngine analysis:"]
+                report.extend(f"  {line}" for line in self.engine.thinking_lines)
+                if self.engine.last_evaluation:
+                    eval_type = self.engine.last_evaluation['type']
+                    value = self.engine.last_evaluation['value']
+                    if eval_type == 'cp':
+                        report.append(f"  Overall evaluation: {value/100:.2f} pawns")
+                    else:  # mate
+                        report.append(f"  Overall evaluation: Mate in {value}")
+                report.append(f"  Best move: {ai_move}\n")
+                print("\n".join(report))
+
+                # Make the move
+                self.board.push_uci(ai_move)
+            else:
+                # If no move was returned, make a random move
                 make_random_move(self.board)
+        except Exception as e:
+            # Handle any errors during AI move generation
+            print(f"Error during AI move generation: {e}")
+            make_random_move(self.board)
+
+        self.check_game_over()
+        self.needs_redraw = True
+
+    def update_position_hashes(self):
+        """
+        Bring the position hashes in line with the board.
+
+        Must be called after every move pushed, and after popping moves.
+        """
+        hashes = self.position_hashes
+        del hashes[len(self.board.move_stack) + 1:]
+        if len(hashes) <= len(self.board.move_stack):
+            hashes.append(chess.polyglot.zobrist_hash(self.board))
+
+    def is_threefold_repetition(self):
+        """
+        Check whether the current position has occurred three times.
+
+        Only positions since the last capture or pawn move can repeat, so at
+        most halfmove_clock earlier hashes are compared.
+
+        Returns:
+            True if the position occurred at least twice before
+        """
+        hashes = self.position_hashes
+        return hashes[-1 - self.board.halfmove_clock:-1].count(hashes[-1]) >= 2
 
     def check_game_over(self):
         """Check if the game is over and update game state."""
-        is_over, result = check_game_over(self.board)
+        self.update_position_hashes()
+        if self.is_threefold_repetition():
+            is_over, result = True, GameResult.DRAW
+        else:
+            is_over, result = check_game_over(self.board)
         if is_over:
             self.game_over = True
             self.game_result = result
@@ -132,12 +237,7 @@ class ChessApp:
             # Record game result for learning if enabled
             try:
                 # Convert result to learning format (1.0 for white win, 0.5 for draw, 0.0 for black win)
-                if result == "White wins":
-                    learn_result = 1.0
-                elif result == "Black wins":
-                    learn_result = 0.0
-                else:  # Draw
-                    learn_result = 0.5
+                learn_result = LEARNING_RESULTS[result]
 
                 # Record the result for learning system
                 if hasattr(self.engine, 'record_game_result') and hasattr(self.engine, 'use_learning') and self.engine.use_learning:
@@ -160,12 +260,18 @@ class ChessApp:
         """Reset the game to the initial state."""
         self.board = chess.Board()
         self.selected_square = None
+        self.selected_piece = None
         self.game_over = False
         self.game_result = None
+        self.position_hashes = [chess.polyglot.zobrist_hash(self.board)]
+
+        # Let a search still running for the old game finish before the
+        # engine's game state is reset, and discard its move
+        if self.ai_future is not None:
+            wait([self.ai_future])
+            self.ai_future = None
 
         # Reset move history
-        self.move_history = []
-        self.current_move_index = -1
         self.redone_moves = []
 
         # Reset the engine's game state if it has a reset method
@@ -178,8 +284,8 @@ class ChessApp:
 
     def undo_move(self):
         """Undo the last move."""
-        if self.game_over:
-            # Can't undo moves if the game is over
+        if self.game_over or self.ai_future is not None:
+            # Can't undo moves if the game is over or the engine is thinking
             return False
 
         # Need to undo both player and AI moves to maintain turn order
@@ -201,13 +307,14 @@ class ChessApp:
                 self.redone_moves.append(move)
                 print(f"Undoing move: {move.uci()}")
 
+        self.update_position_hashes()
         self.needs_redraw = True
         return True
 
     def redo_move(self):
         """Redo a previously undone move."""
-        if self.game_over or not self.redone_moves:
-            # Can't redo moves if the game is over or no moves to redo
+        if self.game_over or not self.redone_moves or self.ai_future is not None:
+            # Can't redo moves if the game is over, no moves to redo or the engine is thinking
             return False
 
         # Need to redo both player and AI moves to maintain turn order
@@ -226,6 +333,7 @@ class ChessApp:
             if self.redone_moves:
                 move = self.redone_moves.pop()
                 self.board.push(move)
+                self.update_position_hashes()
                 print(f"Redoing move: {move.uci()}")
 
         self.needs_redraw = True
@@ -236,25 +344,223 @@ class ChessApp:
         self.player_color = not self.player_color
         self.reset_game()
 
+    def set_difficulty_level(self, level):
+        """
+        Set the engine difficulty from a number key.
+
+        Args:
+            level: The pressed number, 1-9, scaled to the engine's 2-18 range
+        """
+        self.engine.set_difficulty(level * 2)  # Scale 1-9 to 2-18
+        print(f"Difficulty set to {level}")
+
+    def set_opening_style(self, style):
+        """
+        Set the engine's opening style.
+
+        Args:
+            style: One of 'solid', 'aggressive', 'tricky' or 'balanced'
+        """
+        if hasattr(self.engine, 'set_opening_style'):
+            self.engine.set_opening_style(style)
+        else:
+            print("Opening styles not supported by this engine")
+
+    def handle_number_key(self, event):
+        """
+        Handle the number keys 1-9.
+
+        Ctrl+1 through Ctrl+4 select an opening style; otherwise the number sets
+        the difficulty.
+
+        Args:
+            event: The KEYDOWN event for a key between K_1 and K_9
+        """
+        number = event.key - pygame.K_0
+        # The event carries the modifier state, so SDL need not be queried
+        if number in OPENING_STYLE_KEYS and event.mod & pygame.KMOD_CTRL:
+            self.set_opening_style(OPENING_STYLE_KEYS[number])
+        else:
+            self.set_difficulty_level(number)
+
+    def toggle_analysis(self):
+        """Show or hide the analysis panel."""
+        self.show_analysis = not self.show_analysis
+        print(f"Analysis panel {'shown' if self.show_analysis else 'hidden'}")
+
+    def toggle_opening_book(self):
+        """Enable or disable the engine's opening book."""
+        if hasattr(self.engine, 'set_opening_book'):
+            # Toggle the opening book
+            new_state = not self.engine.use_opening_book
+            self.engine.set_opening_book(new_state)
+            print(f"Opening book {'enabled' if new_state else 'disabled'}")
+        else:
+            print("Opening book not supported by this engine")
+
+    def toggle_transposition_table(self):
+        """Enable or disable the engine's position cache."""
+        if hasattr(self.engine, 'set_transposition_table'):
+            # Toggle the transposition table
+            new_state = not self.engine.use_transposition_table
+            self.engine.set_transposition_table(new_state)
+            print(f"Position cache {'enabled' if new_state else 'disabled'}")
+
+            # Show cache stats if enabled
+            if new_state and self.engine.transposition_table:
+                stats = self.engine.transposition_table.get_stats()
+                print(f"Cache size: {stats['max_size']} positions")
+        else:
+            print("Position caching not supported by this engine")
+
+    def toggle_alpha_beta(self):
+        """Enable or disable the engine's alpha-beta search."""
+        if hasattr(self.engine, 'set_alpha_beta'):
+            # Toggle the alpha-beta search
+            new_state = not self.engine.use_alpha_beta
+            self.engine.set_alpha_beta(new_state)
+            print(f"Alpha-beta search {'enabled' if new_state else 'disabled'}")
+
+            # Show search info if enabled
+            if new_state and self.engine.search_algorithm:
+                print(f"Search depth: {self.engine.search_algorithm.max_depth}")
+        else:
+            print("Alpha-beta search not supported by this engine")
+
+    def toggle_quiescence(self):
+        """Enable or disable the engine's quiescence search."""
+        if hasattr(self.engine, 'set_quiescence'):
+            # Toggle the quiescence search
+            new_state = not self.engine.use_quiescence
+            self.engine.set_quiescence(new_state)
+            print(f"Quiescence search {'enabled' if new_state else 'disabled'}")
+
+            # Show quiescence info if enabled
+            if new_state and self.engine.search_algorithm:
+                print(f"Quiescence depth: {self.engine.search_algorithm.quiescence_depth}")
+        else:
+            print("Quiescence search not supported by this engine")
+
+    def toggle_null_move(self):
+        """Enable or disable the engine's null-move pruning."""
+        if hasattr(self.engine, 'set_null_move'):
+            # Toggle the null-move pruning
+            new_state = not self.engine.use_null_move
+            self.engine.set_null_move(new_state)
+            print(f"Null-move pruning {'enabled' if new_state else 'disabled'}")
+
+            # Show null-move info if enabled
+            if new_state and self.engine.search_algorithm:
+                print(f"Reduction factor: {self.engine.search_algorithm.null_move_reduction}")
+        else:
+            print("Null-move pruning not supported by this engine")
+
+    def toggle_learning(self):
+        """Enable or disable the engine's learning system."""
+        if hasattr(self.engine, 'set_learning'):
+            # Toggle the learning system
+            new_state = not self.engine.use_learning
+            self.engine.set_learning(new_state)
+            print(f"Learning system {'enabled' if new_state else 'disabled'}")
+
+            # Show learning info if enabled
+            if new_state and hasattr(self.engine, 'get_learning_stats'):
+                try:
+                    stats = self.engine.get_learning_stats()
+                    print(f"Positions stored: {stats['positions_stored']}, Games learned: {stats['games_learned']}")
+                except Exception as e:
+                    print(f"Error getting learning stats: {e}")
+        else:
+            print("Learning system not supported by this engine")
+
+    def toggle_positional_eval(self):
+        """Switch between positional evaluation and simple material counting."""
+        if hasattr(self.engine, 'set_positional_eval'):
+            # Toggle the positional evaluation
+            new_state = not self.engine.use_positional_eval
+            self.engine.set_positional_eval(new_state)
+            print(f"Advanced positional evaluation {'enabled' if new_state else 'disabled'}")
+
+            if not new_state:
+                print("Using simple material counting")
+            else:
+                print("Using pawn structure, king safety, and mobility analysis")
+        else:
+            print("Positional evaluation not supported by this engine")
+
+    def show_opening_stats(self):
+        """Print the engine's opening repertoire statistics."""
+        if hasattr(self.engine, 'get_opening_stats'):
+            stats = self.engine.get_opening_stats()
+            print("Opening Repertoire Statistics:")
+            print(f"Total positions: {stats.get('total_positions', 0)}")
+            print(f"Total games: {stats.get('total_games', 0)}")
+            print(f"Success rate: {stats.get('success_rate', 0.0):.2f}")
+            print(f"Current style: {stats.get('style', 'balanced')}")
+        else:
+            print("Opening statistics not supported by this engine")
+
+    def handle_undo_key(self):
+        """Undo a move and report whether it worked."""
+        if not self.game_over:
+            if self.undo_move():
+                print("Move undone")
+            else:
+                print("Cannot undo any further")
+
+    def handle_redo_key(self):
+        """Redo a move and report whether it worked."""
+        if not self.game_over:
+            if self.redo_move():
+                print("Move redone")
+            else:
+                print("Cannot redo any further")
+
     def run(self):
         """Run the main game loop."""
         # If player is black, make AI move first
         if self.player_color == chess.BLACK:
             self.make_ai_move()
 
+        # Bind the names used every frame to locals; the board is looked up
+        # again each frame because reset_game replaces it
+        frame_ms = 1000 // FPS
+        get_events = pygame.event.get
+        wait_event = pygame.event.wait
+        flip = pygame.display.flip
+        tick = self.clock.tick
+        key_handlers = self.key_handlers
+        board_renderer = self.board_renderer
+        analysis_panel = self.analysis_panel
+        engine = self.engine
+        NOEVENT, QUIT, MOUSEBUTTONDOWN, KEYDOWN = pygame.NOEVENT, pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN
+        K_1, K_9 = pygame.K_1, pygame.K_9
+
         running = True
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            # Play the engine's move once its search has finished
+            self.finish_ai_move()
+
+            if self.needs_redraw:
+                events = get_events(eventtype=HANDLED_EVENTS)
+            else:
+                # Nothing to draw: sleep until an event arrives or a frame passes
+                event = wait_event(frame_ms)
+                events = get_events(eventtype=HANDLED_EVENTS)
+                if event.type != NOEVENT:
+                    events.insert(0, event)
+
+            for event in events:
+                if event.type == QUIT:
                     running = False
 
                 # Set redraw flag for any user interaction
                 self.needs_redraw = True
 
                 if not self.game_over and self.board.turn == self.player_color:
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        pos = pygame.mouse.get_pos()
-                        square = get_square_from_pos(pos, BOARD_OFFSET_X, BOARD_OFFSET_Y, BOARD_SIZE)
+                    if event.type == MOUSEBUTTONDOWN:
+                        # The click position is part of the event
+                        square = get_square_from_pos(event.pos, BOARD_OFFSET_X, BOARD_OFFSET_Y, BOARD_SIZE)
 
                         if square is not None:
                             if self.selected_square is None:
@@ -262,19 +568,20 @@ class ChessApp:
                                 piece = self.board.piece_at(square)
                                 if piece and piece.color == self.player_color:
                                     self.selected_square = square
+                                    self.selected_piece = piece
                             else:
                                 # Try to make a move
                                 move = chess.Move(self.selected_square, square)
 
                                 # Check for promotion
-                                if (self.board.piece_at(self.selected_square) and
-                                    self.board.piece_at(self.selected_square).piece_type == chess.PAWN and
+                                if (self.selected_piece.piece_type == chess.PAWN and
                                     ((square >= 56 and self.player_color == chess.WHITE) or
                                      (square <= 7 and self.player_color == chess.BLACK))):
                                     move.promotion = chess.QUEEN  # Always promote to queen for simplicity
 
-                                # If the move is legal, make it
-                                if move in self.board.legal_moves:
+                                # If the move is legal, make it. is_legal checks the one
+                                # move without going through the legal move generator.
+                                if self.board.is_legal(move):
                                     # Clear any redone moves when a new move is made
                                     if self.redone_moves:
                                         self.redone_moves = []
@@ -282,231 +589,67 @@ class ChessApp:
                                     # Make the move
                                     self.board.push(move)
                                     self.selected_square = None
+                                    self.selected_piece = None
 
                                     # Check if the game is over
                                     self.check_game_over()
 
-                                    # If the game is not over, make the AI move
+                                    # If the game is not over, let the AI think in the background
                                     if not self.game_over:
                                         self.make_ai_move()
-                                        # Check if the game is over after AI move
-                                        self.check_game_over()
                                 else:
                                     # If the move is not legal, deselect the square
                                     self.selected_square = None
+                                    self.selected_piece = None
 
                 # Handle keyboard events
-                if event.type == pygame.KEYDOWN:
-                    # Reset game with 'r' key
-                    if event.key == pygame.K_r:
-                        self.reset_game()
-
-                    # Switch sides with 's' key
-                    elif event.key == pygame.K_s:
-                        self.switch_sides()
-
-                    # Adjust difficulty with number keys 1-9
-                    elif event.key in [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
-                                      pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9]:
-                        level = int(event.key) - pygame.K_0
-                        self.engine.set_difficulty(level * 2)  # Scale 1-9 to 2-18
-                        print(f"Difficulty set to {level}")
-
-                    # Toggle analysis panel with 'a' key
-                    elif event.key == pygame.K_a:
-                        global SHOW_ANALYSIS
-                        SHOW_ANALYSIS = not SHOW_ANALYSIS
-                        # Resize the window
-                        self.screen = pygame.display.set_mode((WIDTH, HEIGHT + ANALYSIS_PANEL_HEIGHT if SHOW_ANALYSIS else HEIGHT))
-                        print(f"Analysis panel {'shown' if SHOW_ANALYSIS else 'hidden'}")
-
-                    # Toggle opening book with 'b' key
-                    elif event.key == pygame.K_b:
-                        if hasattr(self.engine, 'set_opening_book'):
-                            # Toggle the opening book
-                            new_state = not self.engine.use_opening_book
-                            self.engine.set_opening_book(new_state)
-                            print(f"Opening book {'enabled' if new_state else 'disabled'}")
-                        else:
-                            print("Opening book not supported by this engine")
-
-                    # Toggle transposition table with 'c' key
-                    elif event.key == pygame.K_c:
-                        if hasattr(self.engine, 'set_transposition_table'):
-                            # Toggle the transposition table
-                            new_state = not self.engine.use_transposition_table
-                            self.engine.set_transposition_table(new_state)
-                            print(f"Position cache {'enabled' if new_state else 'disabled'}")
-
-                            # Show cache stats if enabled
-                            if new_state and self.engine.transposition_table:
-                                stats = self.engine.transposition_table.get_stats()
-                                print(f"Cache size: {stats['max_size']} positions")
-                        else:
-                            print("Position caching not supported by this engine")
-
-                    # Toggle alpha-beta search with 's' key
-                    elif event.key == pygame.K_s:
-                        if hasattr(self.engine, 'set_alpha_beta'):
-                            # Toggle the alpha-beta search
-                            new_state = not self.engine.use_alpha_beta
-                            self.engine.set_alpha_beta(new_state)
-                            print(f"Alpha-beta search {'enabled' if new_state else 'disabled'}")
-
-                            # Show search info if enabled
-                            if new_state and self.engine.search_algorithm:
-                                print(f"Search depth: {self.engine.search_algorithm.max_depth}")
-                        else:
-                            print("Alpha-beta search not supported by this engine")
-
-                    # Toggle quiescence search with 'q' key
-                    elif event.key == pygame.K_q:
-                        if hasattr(self.engine, 'set_quiescence'):
-                            # Toggle the quiescence search
-                            new_state = not self.engine.use_quiescence
-                            self.engine.set_quiescence(new_state)
-                            print(f"Quiescence search {'enabled' if new_state else 'disabled'}")
-
-                            # Show quiescence info if enabled
-                            if new_state and self.engine.search_algorithm:
-                                print(f"Quiescence depth: {self.engine.search_algorithm.quiescence_depth}")
-                        else:
-                            print("Quiescence search not supported by this engine")
-
-                    # Toggle null-move pruning with 'n' key
-                    elif event.key == pygame.K_n:
-                        if hasattr(self.engine, 'set_null_move'):
-                            # Toggle the null-move pruning
-                            new_state = not self.engine.use_null_move
-                            self.engine.set_null_move(new_state)
-                            print(f"Null-move pruning {'enabled' if new_state else 'disabled'}")
-
-                            # Show null-move info if enabled
-                            if new_state and self.engine.search_algorithm:
-                                print(f"Reduction factor: {self.engine.search_algorithm.null_move_reduction}")
-                        else:
-                            print("Null-move pruning not supported by this engine")
-
-                    # Toggle learning system with 'l' key
-                    elif event.key == pygame.K_l:
-                        if hasattr(self.engine, 'set_learning'):
-                            # Toggle the learning system
-                            new_state = not self.engine.use_learning
-                            self.engine.set_learning(new_state)
-                            print(f"Learning system {'enabled' if new_state else 'disabled'}")
-
-                            # Show learning info if enabled
-                            if new_state and hasattr(self.engine, 'get_learning_stats'):
-                                try:
-                                    stats = self.engine.get_learning_stats()
-                                    print(f"Positions stored: {stats['positions_stored']}, Games learned: {stats['games_learned']}")
-                                except Exception as e:
-                                    print(f"Error getting learning stats: {e}")
-                        else:
-                            print("Learning system not supported by this engine")
-
-                    # Toggle positional evaluation with 'p' key
-                    elif event.key == pygame.K_p:
-                        if hasattr(self.engine, 'set_positional_eval'):
-                            # Toggle the positional evaluation
-                            new_state = not self.engine.use_positional_eval
-                            self.engine.set_positional_eval(new_state)
-                            print(f"Advanced positional evaluation {'enabled' if new_state else 'disabled'}")
-
-                            if not new_state:
-                                print("Using simple material counting")
-                            else:
-                                print("Using pawn structure, king safety, and mobility analysis")
-                        else:
-                            print("Positional evaluation not supported by this engine")
-
-                    # Set opening style with number keys
-                    elif event.key == pygame.K_1 and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        if hasattr(self.engine, 'set_opening_style'):
-                            self.engine.set_opening_style('solid')
-                        else:
-                            print("Opening styles not supported by this engine")
-                    elif event.key == pygame.K_2 and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        if hasattr(self.engine, 'set_opening_style'):
-                            self.engine.set_opening_style('aggressive')
-                        else:
-                            print("Opening styles not supported by this engine")
-                    elif event.key == pygame.K_3 and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        if hasattr(self.engine, 'set_opening_style'):
-                            self.engine.set_opening_style('tricky')
-                        else:
-                            print("Opening styles not supported by this engine")
-                    elif event.key == pygame.K_4 and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        if hasattr(self.engine, 'set_opening_style'):
-                            self.engine.set_opening_style('balanced')
-                        else:
-                            print("Opening styles not supported by this engine")
-
-                    # Show opening stats with 'o' key
-                    elif event.key == pygame.K_o:
-                        if hasattr(self.engine, 'get_opening_stats'):
-                            stats = self.engine.get_opening_stats()
-                            print("Opening Repertoire Statistics:")
-                            print(f"Total positions: {stats.get('total_positions', 0)}")
-                            print(f"Total games: {stats.get('total_games', 0)}")
-                            print(f"Success rate: {stats.get('success_rate', 0.0):.2f}")
-                            print(f"Current style: {stats.get('style', 'balanced')}")
-                        else:
-                            print("Opening statistics not supported by this engine")
-
-                    # Undo move with 'z' key or left arrow
-                    elif event.key in [pygame.K_z, pygame.K_LEFT]:
-                        if not self.game_over:
-                            if self.undo_move():
-                                print("Move undone")
-                            else:
-                                print("Cannot undo any further")
-
-                    # Redo move with 'y' key or right arrow
-                    elif event.key in [pygame.K_y, pygame.K_RIGHT]:
-                        if not self.game_over:
-                            if self.redo_move():
-                                print("Move redone")
-                            else:
-                                print("Cannot redo any further")
-
-            # Check if we need to redraw the screen
-            current_board_state = self.board.fen()
-            board_changed = (current_board_state != self.last_board_state)
-
-            # Set redraw flag if board changed or it's a key frame
-            if board_changed or self.needs_redraw or self.frame_count % 5 == 0:  # Only update every 5 frames if nothing changed
+                if event.type == KEYDOWN:
+                    handler = key_handlers.get(event.key)
+                    if self.ai_future is not None and (event.key in ENGINE_KEYS or K_1 <= event.key <= K_9):
+                        # The engine's settings are in use by the running search
+                        print("The engine is thinking; try again after its move")
+                    elif handler:
+                        handler()
+                    elif K_1 <= event.key <= K_9:
+                        self.handle_number_key(event)
+
+            # Check if we need to redraw the screen. Every change to the board
+            # goes through a push or pop, so the move count stands in for the
+            # position without serializing it each frame. Nothing else on screen
+            # changes without an event, so an unchanged state is never redrawn.
+            board = self.board
+            current_board_state = (len(board.move_stack), self.selected_square, self.game_over,
+                                   self.show_analysis, tuple(engine.thinking_lines[:3]))
+            if current_board_state != self.last_board_state:
                 self.needs_redraw = True
                 self.last_board_state = current_board_state
 
             # Render only if needed
             if self.needs_redraw:
-                # Fill the screen with the background color
-                self.screen.fill(BACKGROUND_COLOR)
-
-                # Render the board
-                self.board_renderer.render_board(self.board, self.selected_square)
-                self.board_renderer.render_coordinates()
+                # Draw the static background, then the board's pieces
+                board_renderer.render_background()
+                board_renderer.render_board(board, self.selected_square)
 
                 # Display game result if game is over
                 if self.game_over:
-                    self.board_renderer.render_game_result(self.game_result)
+                    board_renderer.render_game_result(self.game_result)
 
-                # Display analysis panel
-                if SHOW_ANALYSIS:
-                    self.analysis_panel.render(self.board, self.engine)
+                # Display analysis panel. The engine is not asked for an
+                # evaluation while it searches on the worker thread.
+                if self.show_analysis:
+                    analysis_panel.render(board, engine, evaluate=self.ai_future is None)
 
                 # Update the display
-                pygame.display.flip()
+                flip()
 
                 # Reset the redraw flag
                 self.needs_redraw = False
 
-            # Increment frame counter
-            self.frame_count = (self.frame_count + 1) % 60  # Reset every second at 60 FPS
-
             # Cap the frame rate
-            self.clock.tick(FPS)
+            tick(FPS)
+
+        # Let a running search finish before cleaning up the engine
+        self.ai_executor.shutdown(wait=True)
 
         # Clean up engine resources
         if hasattr(self, 'engine') and self.engine.is_initialized:
@@ -6,6 +6,13 @@ This module contains utility functions used across the application.
 import os
 import chess
 import random
+from enum import IntEnum
+
+class GameResult(IntEnum):
+    """The result of a finished game, from white's point of view."""
+    BLACK_WIN = -1
+    DRAW = 0
+    WHITE_WIN = 1
 
 def clear_screen():
     """Clear the terminal screen."""
@@ -21,9 +28,14 @@ def make_random_move(board):
     Returns:
         The move that was made, or None if no legal moves.
     """
-    legal_moves = list(board.legal_moves)
-    if legal_moves:
-        random_move = random.choice(legal_moves)
+    # Reservoir sampling: the i-th move replaces the choice with probability
+    # 1/i, so each move is equally likely without building a list of them all
+    random_move = None
+    for count, move in enumerate(board.generate_legal_moves(), 1):
+        if random.randrange(count) == 0:
+            random_move = move
+
+    if random_move is not None:
         print(f"Making random move: {board.san(random_move)}")
         board.push(random_move)
         return random_move
@@ -39,27 +51,17 @@ def check_game_over(board):
     Returns:
         A tuple (is_game_over, result) where:
         - is_game_over is a boolean indicating if the game is over
-        - result is a string representing the result ('1-0', '0-1', '1/2-1/2', or None)
+        - result is a GameResult, or None if the game is not over
     """
-    # First check if the game is over according to python-chess
-    if board.is_game_over():
-        if board.is_checkmate():
-            # If it's checkmate, the side that just moved won
-            result = "0-1" if board.turn == chess.WHITE else "1-0"
-        elif board.is_stalemate():
-            result = "1/2-1/2"  # Stalemate is a draw
-        elif board.is_insufficient_material():
-            result = "1/2-1/2"  # Insufficient material is a draw
-        elif board.can_claim_fifty_moves():
-            result = "1/2-1/2"  # Fifty-move rule is a draw
-        elif board.can_claim_threefold_repetition():
-            result = "1/2-1/2"  # Threefold repetition is a draw
-        else:
-            result = "1/2-1/2"  # Default to draw for other game-over conditions
-        return True, result
-
-    # If not game over according to python-chess, check additional conditions
-    # that might be considered game over in our application
+    # A single outcome() call finds the termination, rather than calling
+    # is_game_over() and then testing each ending again. Draws that have to be
+    # claimed (threefold repetition, fifty moves) are not checked, as before.
+    outcome = board.outcome()
+    if outcome is not None:
+        if outcome.winner is None:
+            return True, GameResult.DRAW
+        return True, GameResult.WHITE_WIN if outcome.winner == chess.WHITE else GameResult.BLACK_WIN
+
     return False, None
 
 def get_square_from_pos(pos, board_offset_x, board_offset_y, board_size):
@@ -76,11 +78,14 @@ def get_square_from_pos(pos, board_offset_x, board_offset_y, board_size):
         A chess.Square representing the square at the given position, or None if outside the board.
     """
     x, y = pos
-    if (x < board_offset_x or x > board_offset_x + board_size or
-        y < board_offset_y or y > board_offset_y + board_size):
-        return None
 
-    file_idx = int((x - board_offset_x) / (board_size / 8))
-    rank_idx = 7 - int((y - board_offset_y) / (board_size / 8))
+    # Squares are drawn board_size // 8 pixels wide (see BoardRenderer), so
+    # use the same integer size here and ignore the few leftover pixels
+    square_size = board_size // 8
+    file_idx = (x - board_offset_x) // square_size
+    rank_idx = (y - board_offset_y) // square_size
+    if not (0 <= file_idx < 8 and 0 <= rank_idx < 8):
+        return None
 
-    return chess.square(file_idx, rank_idx)
+    # Same as chess.square(file_idx, 7 - rank_idx), without the function call
+    return (7 - rank_idx) << 3 | file_idx
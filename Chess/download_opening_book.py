@@ -7,8 +7,8 @@ This script downloads a sample Polyglot opening book for use with the chess AI.
 import os
 import sys
 import urllib.request
-import shutil
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 # URLs for sample opening books
 BOOK_URLS = {
@@ -17,13 +17,95 @@ BOOK_URLS = {
     "large": "https://github.com/official-stockfish/books/raw/master/bin/perfect2021.bin"
 }
 
+# Bytes read from the connection and written to disk at a time
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Seconds to wait for the server before giving up
+DOWNLOAD_TIMEOUT = 30
+
+# Number of byte ranges fetched in parallel after the first chunk
+DOWNLOAD_WORKERS = 4
+
+def _copy_response(response, out_file):
+    """
+    Copy an HTTP response body to a file.
+
+    Args:
+        response: An open urllib response
+        out_file: A file opened for binary writing at the target offset
+
+    Returns:
+        The number of bytes copied
+    """
+    # Read each chunk into the same buffer rather than allocating a new bytes
+    # object per chunk
+    buffer = bytearray(DOWNLOAD_CHUNK_SIZE)
+    view = memoryview(buffer)
+    copied = 0
+    while True:
+        length = response.readinto(buffer)
+        if not length:
+            return copied
+        out_file.write(view[:length])
+        copied += length
+
+def _download_range(url, destination, start, end):
+    """
+    Download one byte range of a file into the same offsets of the destination.
+
+    Args:
+        url: The URL of the file
+        destination: The path of the partly downloaded file
+        start: The first byte of the range
+        end: The last byte of the range (inclusive)
+    """
+    request = urllib.request.Request(url, headers={'Range': f'bytes={start}-{end}'})
+    with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response, open(destination, 'r+b') as out_file:
+        if response.status != 206:
+            raise IOError(f"Server ignored the request for bytes {start}-{end}")
+        out_file.seek(start)
+        if _copy_response(response, out_file) != end - start + 1:
+            raise IOError(f"Incomplete download of bytes {start}-{end}")
+
 def download_file(url, destination):
-    """Download a file from a URL to a destination path."""
+    """
+    Download a file from a URL to a destination path.
+
+    The first chunk is requested as a byte range. If the server honours it,
+    the rest of the file is fetched as DOWNLOAD_WORKERS ranges in parallel;
+    otherwise the server sends the whole file in that first response.
+
+    Args:
+        url: The URL of the file
+        destination: The path to save the file to
+
+    Returns:
+        True if the download succeeded, False otherwise
+    """
     print(f"Downloading from {url}...")
     
     try:
-        with urllib.request.urlopen(url) as response, open(destination, 'wb') as out_file:
-            shutil.copyfileobj(response, out_file)
+        request = urllib.request.Request(url, headers={'Range': f'bytes=0-{DOWNLOAD_CHUNK_SIZE - 1}'})
+        with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response, open(destination, 'wb') as out_file:
+            _copy_response(response, out_file)
+            # Content-Range is "bytes 0-1048575/<total size>" for a partial response
+            total_size = None
+            if response.status == 206:
+                total_size = int(response.headers['Content-Range'].rpartition('/')[2])
+
+        if total_size is not None and total_size > DOWNLOAD_CHUNK_SIZE:
+            # Split the rest of the file into equal ranges, one per worker
+            remaining = total_size - DOWNLOAD_CHUNK_SIZE
+            range_size = -(-remaining // DOWNLOAD_WORKERS)
+            ranges = [(start, min(start + range_size, total_size) - 1)
+                      for start in range(DOWNLOAD_CHUNK_SIZE, total_size, range_size)]
+
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(_download_range, url, destination, start, end)
+                           for start, end in ranges]
+                for future in futures:
+                    future.result()
+
         print(f"Downloaded to {destination}")
         return True
     except Exception as e:
@@ -5,8 +5,12 @@ This program creates a chess game where you can play against the Sunfish chess e
 
 import pygame
 import chess
+import chess.polyglot
 import os
 import sys
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from sunfish_wrapper import SunfishWrapper
 
 # Constants
@@ -14,6 +18,7 @@ WIDTH, HEIGHT = 600, 600  # Reduced from 800x800
 BOARD_SIZE = 550  # Reduced from 700
 BOARD_OFFSET_X = (WIDTH - BOARD_SIZE) // 2
 BOARD_OFFSET_Y = (HEIGHT - BOARD_SIZE) // 2
+SQUARE_SIZE = BOARD_SIZE // 8
 FPS = 60
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -34,6 +39,92 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT + ANALYSIS_PANEL_HEIGHT if SHOW_
 pygame.display.set_caption("Chess AI with Sunfish - Compact")
 clock = pygame.time.Clock()
 
+# Unicode glyph for each (piece_type, color)
+PIECE_CHARS = {
+    (piece_type, color): char
+    for color, chars in ((chess.WHITE, '♙♘♗♖♕♔'), (chess.BLACK, '♟♞♝♜♛♚'))
+    for piece_type, char in zip(chess.PIECE_TYPES, chars)
+}
+# Use gold color for white pieces and silver for black pieces
+PIECE_COLORS = {chess.WHITE: (212, 175, 55), chess.BLACK: (192, 192, 192)}
+
+def _render_piece_surfaces():
+    """
+    Render every piece glyph once, since they never change.
+
+    Returns:
+        A dictionary mapping (piece_type, color) to a (shadow, piece) pair of surfaces
+    """
+    font = pygame.font.SysFont('segoeuisymbol', SQUARE_SIZE - 8)  # Adjusted for smaller squares
+    return {
+        (piece_type, color): (
+            font.render(char, True, (0, 0, 0)).convert_alpha(),  # Black outline/shadow for contrast
+            font.render(char, True, PIECE_COLORS[color]).convert_alpha()
+        )
+        for (piece_type, color), char in PIECE_CHARS.items()
+    }
+
+def _render_board_background():
+    """
+    Render the empty board once, since the squares never change.
+
+    Returns:
+        A BOARD_SIZE surface with the light and dark squares drawn on it
+    """
+    background = pygame.Surface((BOARD_SIZE, BOARD_SIZE))
+    background.fill(BACKGROUND_COLOR)
+    for row in range(8):
+        for col in range(8):
+            # Determine square color (alternating light gray and dark gray/black)
+            color = LIGHT_SQUARE if (row + col) % 2 == 0 else DARK_SQUARE
+            pygame.draw.rect(background, color, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+    return background.convert()
+
+def _render_translucent(color, size=(SQUARE_SIZE, SQUARE_SIZE)):
+    """
+    Render a translucent rectangle, such as the highlight of a board square.
+
+    Args:
+        color: An RGBA color tuple
+        size: The (width, height) of the rectangle, one square by default
+
+    Returns:
+        A surface of the given size filled with the color
+    """
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    surface.fill(color)
+    return surface.convert_alpha()
+
+# Fonts for the analysis panel and the game result, created once
+FONTS = {
+    'title': pygame.font.SysFont('Arial', 16, bold=True),  # Reduced from 18
+    'info': pygame.font.SysFont('Arial', 14),  # Reduced from 16
+    'result': pygame.font.SysFont('Arial', 32),
+}
+
+@functools.lru_cache(maxsize=256)
+def render_text(font_name, text, color):
+    """
+    Render a line of text, reusing the surface when the same text is drawn again.
+
+    Args:
+        font_name: A key of FONTS
+        text: The text to render
+        color: An RGB color tuple
+
+    Returns:
+        The rendered text surface
+    """
+    return FONTS[font_name].render(text, True, color).convert_alpha()
+
+PIECE_SURFACES = _render_piece_surfaces()
+BOARD_BACKGROUND = _render_board_background()
+SELECTED_HIGHLIGHT = _render_translucent((124, 252, 0, 128))  # Light green with transparency
+LAST_MOVE_HIGHLIGHT = _render_translucent((135, 206, 250, 128))  # Light blue with transparency
+# Semi-transparent backgrounds for the game result and the analysis panel
+RESULT_OVERLAY = _render_translucent((0, 0, 0, 180), (WIDTH, 100))  # Black with 70% opacity
+ANALYSIS_PANEL_BACKGROUND = _render_translucent(ANALYSIS_PANEL_COLOR, (WIDTH, ANALYSIS_PANEL_HEIGHT))
+
 # Initialize the chess board
 board = chess.Board()
 
@@ -130,117 +221,213 @@ def get_square_from_pos(pos):
 
     return chess.square(file_idx, rank_idx)
 
+# Legal moves of the last position they were generated for
+_legal_moves_cache = {'key': None, 'moves': None}
+
+def legal_move_set():
+    """
+    Get the legal moves of the current position, generating them only once per position.
+
+    Returns:
+        A set of the legal chess.Move objects on the board
+    """
+    key = board._transposition_key()
+    if _legal_moves_cache['key'] != key:
+        _legal_moves_cache['moves'] = set(board.legal_moves)
+        _legal_moves_cache['key'] = key
+    return _legal_moves_cache['moves']
+
 def render_board():
     """Render the chess board with pieces."""
     # Fill the background with medium gray
     screen.fill(BACKGROUND_COLOR)
 
-    # Draw the chess board
-    square_size = BOARD_SIZE // 8
+    # Draw the empty chess board from the pre-rendered squares
+    screen.blit(BOARD_BACKGROUND, (BOARD_OFFSET_X, BOARD_OFFSET_Y))
+
+    # Squares of the last move, looked up once rather than for every square
+    last_move_squares = ()
+    if board.move_stack:
+        last_move = board.peek()
+        last_move_squares = (last_move.from_square, last_move.to_square)
+
+    # Draw highlights and pieces on top
+    square_size = SQUARE_SIZE
     for row in range(8):
         for col in range(8):
-            # Determine square color (alternating light gray and dark gray/black)
-            color = LIGHT_SQUARE if (row + col) % 2 == 0 else DARK_SQUARE
-            # Draw the square
-            pygame.draw.rect(screen, color, (
-                BOARD_OFFSET_X + col * square_size,
-                BOARD_OFFSET_Y + row * square_size,
-                square_size,
-                square_size
-            ))
-
             # Get the piece at this square
             square = chess.square(col, 7-row)  # Convert to chess.square format
             piece = board.piece_at(square)
 
             # Highlight selected square
             if selected_square is not None and square == selected_square:
-                highlight = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-                highlight.fill((124, 252, 0, 128))  # Light green with transparency
-                screen.blit(highlight, (BOARD_OFFSET_X + col * square_size, BOARD_OFFSET_Y + row * square_size))
+                screen.blit(SELECTED_HIGHLIGHT, (BOARD_OFFSET_X + col * square_size, BOARD_OFFSET_Y + row * square_size))
 
             # Highlight last move
-            if board.move_stack:
-                last_move = board.peek()
-                if square == last_move.from_square or square == last_move.to_square:
-                    highlight = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-                    highlight.fill((135, 206, 250, 128))  # Light blue with transparency
-                    screen.blit(highlight, (BOARD_OFFSET_X + col * square_size, BOARD_OFFSET_Y + row * square_size))
-
-            # Draw the piece if there is one
+            if square in last_move_squares:
+                screen.blit(LAST_MOVE_HIGHLIGHT, (BOARD_OFFSET_X + col * square_size, BOARD_OFFSET_Y + row * square_size))
+
+            # Draw the piece if there is one, from the pre-rendered glyphs
             if piece:
-                # Create a text representation of the piece
-                piece_chars = {
-                    chess.PAWN: '♙' if piece.color == chess.WHITE else '♟',
-                    chess.KNIGHT: '♘' if piece.color == chess.WHITE else '♞',
-                    chess.BISHOP: '♗' if piece.color == chess.WHITE else '♝',
-                    chess.ROOK: '♖' if piece.color == chess.WHITE else '♜',
-                    chess.QUEEN: '♕' if piece.color == chess.WHITE else '♛',
-                    chess.KING: '♔' if piece.color == chess.WHITE else '♚'
-                }
-                piece_char = piece_chars[piece.piece_type]
-
-                # Render the piece with improved visibility
-                font = pygame.font.SysFont('segoeuisymbol', square_size - 8)  # Adjusted for smaller squares
-
-                # Use gold color for white pieces and silver for black pieces
-                piece_color = (212, 175, 55) if piece.color == chess.WHITE else (192, 192, 192)
-
-                # Add a black outline/shadow for better contrast
+                shadow, text = PIECE_SURFACES[piece.piece_type, piece.color]
+
+                # Draw the shadow first for better contrast
                 shadow_offset = 1
-                shadow = font.render(piece_char, True, (0, 0, 0))
                 shadow_rect = shadow.get_rect(center=(
                     BOARD_OFFSET_X + col * square_size + square_size // 2 + shadow_offset,
                     BOARD_OFFSET_Y + row * square_size + square_size // 2 + shadow_offset
                 ))
                 screen.blit(shadow, shadow_rect)
 
-                # Render the actual piece
-                text = font.render(piece_char, True, piece_color)
+                # Draw the actual piece
                 text_rect = text.get_rect(center=(
                     BOARD_OFFSET_X + col * square_size + square_size // 2,
                     BOARD_OFFSET_Y + row * square_size + square_size // 2
                 ))
                 screen.blit(text, text_rect)
 
-def make_ai_move():
-    """Make a move with the chess engine, handling any errors gracefully."""
-    if not board.is_game_over():
-        try:
-            if engine.is_initialized:
-                # This will also populate the thinking lines and evaluation
-                ai_move = engine.get_best_move(board)
-                if ai_move:
-                    # Print engine's thinking to console
-                    print("\nEngine analysis:")
-                    for line in engine.thinking_lines:
-                        print(f"  {line}")
-                    if engine.last_evaluation:
-                        eval_type = engine.last_evaluation['type']
-                        value = engine.last_evaluation['value']
-                        if eval_type == 'cp':
-                            print(f"  Overall evaluation: {value/100:.2f} pawns")
-                        else:  # mate
-                            print(f"  Overall evaluation: Mate in {value}")
-                    print(f"  Best move: {ai_move}\n")
-
-                    # Make the move
-                    board.push_uci(ai_move)
-                else:
-                    # If no move was returned, make a random move
-                    _make_random_move()
-            else:
-                # If engine is not available, make a random legal move
-                _make_random_move()
-        except Exception as e:
-            # Handle any errors during AI move generation
-            print(f"Error during AI move generation: {e}")
-            _make_random_move()
+# Results of earlier searches, most recently used last. The cache is only
+# read and written on the main thread.
+MAX_SEARCH_CACHE_SIZE = 1 << 16
+search_cache = OrderedDict()
+
+def search_key(search_board):
+    """
+    Get the search cache key of a position.
+
+    Positions are keyed by their Zobrist hash, which covers castling rights and
+    the en passant square, and by the engine's skill level.
+
+    Args:
+        search_board: A chess.Board object
+
+    Returns:
+        A hashable key for search_cache
+    """
+    return (chess.polyglot.zobrist_hash(search_board), getattr(engine, 'skill_level', None))
+
+def cached_best_move(key):
+    """
+    Get the engine's move from an earlier search of the same position.
+
+    The engine picks its move at random among the better candidates, so a hit
+    replays the move it chose the first time rather than choosing again. A
+    hit also restores the engine's thinking lines and evaluation from that
+    search.
+
+    Args:
+        key: The position's key (see search_key)
+
+    Returns:
+        The move in UCI notation, or None if the position was not searched yet
+    """
+    cached = search_cache.get(key)
+    if cached is None:
+        return None
+    search_cache.move_to_end(key)
+    ai_move, engine.last_evaluation, thinking_lines = cached
+    engine.thinking_lines = list(thinking_lines)
+    return ai_move
+
+def store_best_move(key, ai_move):
+    """
+    Remember the engine's move and analysis for a position it has just searched.
+
+    Args:
+        key: The position's key (see search_key)
+        ai_move: The move in UCI notation, or None if the engine found none
+    """
+    if ai_move:
+        search_cache[key] = (ai_move, engine.last_evaluation, list(engine.thinking_lines))
+        if len(search_cache) > MAX_SEARCH_CACHE_SIZE:
+            search_cache.popitem(last=False)
+
+# The engine searches on a worker thread so the window keeps responding
+ai_executor = ThreadPoolExecutor(max_workers=1)
+ai_future = None  # Pending engine move, if the engine is thinking
+ai_search_key = None  # Search cache key of the position being searched
+
+def start_ai_move():
+    """Start the engine's search in the background; finish_ai_move plays the result."""
+    global ai_future, ai_search_key
+    if board.is_game_over() or ai_future is not None:
+        return
+    if engine.is_initialized:
+        key = search_key(board)
+        ai_move = cached_best_move(key)
+        if ai_move is not None:
+            # The position was searched before; no need to search it again
+            _play_ai_move(ai_move)
+            return
+        # Search a copy so the board can be drawn while the engine thinks
+        ai_search_key = key
+        ai_future = ai_executor.submit(engine.get_best_move, board.copy())
+    else:
+        # If engine is not available, make a random legal move
+        _make_random_move()
+
+def finish_ai_move():
+    """
+    Play the engine's move if its background search has finished.
+
+    Returns:
+        True if a move was played, False if the engine is still thinking or idle
+    """
+    global ai_future
+    if ai_future is None or not ai_future.done():
+        return False
+
+    future = ai_future
+    ai_future = None
+    try:
+        # This will also have populated the thinking lines and evaluation
+        ai_move = future.result()
+        store_best_move(ai_search_key, ai_move)
+        _play_ai_move(ai_move)
+    except Exception as e:
+        # Handle any errors during AI move generation
+        print(f"Error during AI move generation: {e}")
+        _make_random_move()
+    return True
+
+def discard_ai_move():
+    """
+    Wait for a search still running to finish and drop its move.
+
+    The search writes the engine's thinking lines and evaluation until it
+    ends, so it must not outlive the game it was started for.
+    """
+    global ai_future
+    if ai_future is not None:
+        wait([ai_future])
+        ai_future = None
+
+def _play_ai_move(ai_move):
+    """Print the engine's analysis and push its move, or a random move if it found none."""
+    if ai_move:
+        # Print engine's thinking to console
+        print("\nEngine analysis:")
+        for line in engine.thinking_lines:
+            print(f"  {line}")
+        if engine.last_evaluation:
+            eval_type = engine.last_evaluation['type']
+            value = engine.last_evaluation['value']
+            if eval_type == 'cp':
+                print(f"  Overall evaluation: {value/100:.2f} pawns")
+            else:  # mate
+                print(f"  Overall evaluation: Mate in {value}")
+        print(f"  Best move: {ai_move}\n")
+
+        # Make the move
+        board.push_uci(ai_move)
+    else:
+        # If no move was returned, make a random move
+        _make_random_move()
 
 def _make_random_move():
     """Make a random legal move as a fallback."""
     import random
-    legal_moves = list(board.legal_moves)
+    legal_moves = list(legal_move_set())
     if legal_moves:
         random_move = random.choice(legal_moves)
         print(f"Making random move: {board.san(random_move)}")
@@ -270,21 +457,16 @@ def check_game_over():
 def display_game_result():
     """Display the game result on the screen."""
     if game_result:
-        # Create a semi-transparent background for the text
-        overlay = pygame.Surface((WIDTH, 100), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # Black with 70% opacity
-        screen.blit(overlay, (0, 0))
+        # Draw a semi-transparent background for the text
+        screen.blit(RESULT_OVERLAY, (0, 0))
 
         # Render the text with a shadow for better visibility
-        font = pygame.font.SysFont('Arial', 32)
-
-        # Shadow
-        shadow = font.render(game_result, True, BLACK)
+        shadow = render_text('result', game_result, BLACK)
         shadow_rect = shadow.get_rect(center=(WIDTH//2 + 2, 50 + 2))
         screen.blit(shadow, shadow_rect)
 
         # Main text
-        text = font.render(game_result, True, (255, 215, 0))  # Gold color
+        text = render_text('result', game_result, (255, 215, 0))  # Gold color
         text_rect = text.get_rect(center=(WIDTH//2, 50))
         screen.blit(text, text_rect)
 
@@ -301,22 +483,27 @@ def display_analysis_panel():
         panel_rect = pygame.Rect(0, HEIGHT, WIDTH, ANALYSIS_PANEL_HEIGHT)
 
         # Draw panel background
-        panel_surface = pygame.Surface((WIDTH, ANALYSIS_PANEL_HEIGHT), pygame.SRCALPHA)
-        panel_surface.fill(ANALYSIS_PANEL_COLOR)
-        screen.blit(panel_surface, panel_rect)
+        screen.blit(ANALYSIS_PANEL_BACKGROUND, panel_rect)
 
         # Draw border line
         pygame.draw.line(screen, (50, 50, 50), (0, HEIGHT), (WIDTH, HEIGHT), 2)
 
-        # Prepare fonts
-        title_font = pygame.font.SysFont('Arial', 16, bold=True)  # Reduced from 18
-        info_font = pygame.font.SysFont('Arial', 14)  # Reduced from 16
-
         # Draw title
         engine_name = "Chess Engine Analysis"
-        title = title_font.render(engine_name, True, (255, 215, 0))  # Gold color
+        title = render_text('title', engine_name, (255, 215, 0))  # Gold color
         screen.blit(title, (10, HEIGHT + 8))  # Adjusted position
 
+        # Draw current position information
+        position_info = f"Move: {1 + board.fullmove_number//2}{'.' if board.turn == chess.WHITE else '...'}"
+        position_surface = render_text('info', position_info, ANALYSIS_TEXT_COLOR)
+        screen.blit(position_surface, (WIDTH - 120, HEIGHT + 8))  # Adjusted position
+
+        # The engine's analysis is being rewritten while it searches
+        if ai_future is not None:
+            thinking_surface = render_text('info', "Thinking...", ANALYSIS_TEXT_COLOR)
+            screen.blit(thinking_surface, (20, HEIGHT + 30))
+            return
+
         # Draw evaluation
         y_offset = HEIGHT + 30  # Reduced from 40
         try:
@@ -338,12 +525,12 @@ def display_analysis_panel():
                     # Mate is always bad for the side to move
                     eval_color = (255, 150, 150) if value < 0 else (150, 255, 150)
 
-                eval_surface = info_font.render(eval_text, True, eval_color)
+                eval_surface = render_text('info', eval_text, eval_color)
                 screen.blit(eval_surface, (20, y_offset))
         except Exception as e:
             # If there's an error getting evaluation, show a neutral message
             error_text = "Evaluation unavailable"
-            error_surface = info_font.render(error_text, True, ANALYSIS_TEXT_COLOR)
+            error_surface = render_text('info', error_text, ANALYSIS_TEXT_COLOR)
             screen.blit(error_surface, (20, y_offset))
 
         # Draw thinking lines
@@ -351,18 +538,13 @@ def display_analysis_panel():
         try:
             if engine.thinking_lines:
                 for i, line in enumerate(engine.thinking_lines[:3]):  # Show top 3 lines
-                    line_surface = info_font.render(f"{i+1}. {line}", True, ANALYSIS_TEXT_COLOR)
+                    line_surface = render_text('info', f"{i+1}. {line}", ANALYSIS_TEXT_COLOR)
                     screen.blit(line_surface, (10, y_offset + i * 20))  # Reduced spacing from 25 to 20
         except Exception as e:
             # If there's an error getting thinking lines, show a message
             error_text = "Analysis unavailable"
-            error_surface = info_font.render(error_text, True, ANALYSIS_TEXT_COLOR)
+            error_surface = render_text('info', error_text, ANALYSIS_TEXT_COLOR)
             screen.blit(error_surface, (10, y_offset))
-
-        # Draw current position information
-        position_info = f"Move: {1 + board.fullmove_number//2}{'.' if board.turn == chess.WHITE else '...'}"
-        position_surface = info_font.render(position_info, True, ANALYSIS_TEXT_COLOR)
-        screen.blit(position_surface, (WIDTH - 120, HEIGHT + 8))  # Adjusted position
     except Exception as e:
         # If there's a critical error in the analysis panel, log it but don't crash
         print(f"Error displaying analysis panel: {e}")
@@ -372,14 +554,20 @@ def main():
 
     # If player is black, make AI move first
     if player_color == chess.BLACK:
-        make_ai_move()
+        start_ai_move()
 
     running = True
+    dirty = True  # Whether the screen needs to be redrawn
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
+            # Clicks and key presses may change the game; the screen only
+            # needs repainting otherwise when the window is uncovered
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.VIDEOEXPOSE):
+                dirty = True
+
             if not game_over and board.turn == player_color:
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     pos = pygame.mouse.get_pos()
@@ -400,13 +588,13 @@ def main():
                                  (square <= 7 and player_color == chess.BLACK))):
                                 move.promotion = chess.QUEEN  # Always promote to queen for simplicity
 
-                            if move in board.legal_moves:
+                            if move in legal_move_set():
                                 board.push(move)
                                 selected_square = None
 
                                 # After player's move, let AI respond
                                 if not board.is_game_over():
-                                    make_ai_move()
+                                    start_ai_move()
                             else:
                                 # If the move is not legal, deselect or select a new piece
                                 piece = board.piece_at(square)
@@ -418,22 +606,24 @@ def main():
             # Reset game with 'r' key
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
+                    discard_ai_move()
                     board.reset()
                     selected_square = None
                     game_over = False
                     game_result = None
                     if player_color == chess.BLACK:
-                        make_ai_move()
+                        start_ai_move()
 
                 # Switch sides with 's' key
                 elif event.key == pygame.K_s:
                     player_color = not player_color
+                    discard_ai_move()
                     board.reset()
                     selected_square = None
                     game_over = False
                     game_result = None
                     if player_color == chess.BLACK:
-                        make_ai_move()
+                        start_ai_move()
 
                 # Adjust difficulty with number keys 1-9
                 elif event.key in [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
@@ -450,30 +640,38 @@ def main():
                     screen = pygame.display.set_mode((WIDTH, HEIGHT + ANALYSIS_PANEL_HEIGHT if SHOW_ANALYSIS else HEIGHT))
                     print(f"Analysis panel {'shown' if SHOW_ANALYSIS else 'hidden'}")
 
-        # Fill the screen with the background color
-        screen.fill(BACKGROUND_COLOR)
+        # Play the engine's move once its search is done
+        if finish_ai_move():
+            dirty = True
+
+        # Redraw only when something may have changed
+        if dirty:
+            # Fill the screen with the background color
+            screen.fill(BACKGROUND_COLOR)
 
-        # Render the board
-        render_board()
+            # Render the board
+            render_board()
 
-        # Check if the game is over
-        check_game_over()
+            # Check if the game is over
+            check_game_over()
 
-        # Display game result if game is over
-        if game_over:
-            display_game_result()
+            # Display game result if game is over
+            if game_over:
+                display_game_result()
 
-        # Display analysis panel
-        if SHOW_ANALYSIS:
-            display_analysis_panel()
+            # Display analysis panel
+            if SHOW_ANALYSIS:
+                display_analysis_panel()
 
-        # Update the display
-        pygame.display.flip()
+            # Update the display
+            pygame.display.flip()
+            dirty = False
 
         # Cap the frame rate
         clock.tick(FPS)
 
     # Clean up engine resources
+    ai_executor.shutdown(wait=True)
     if engine and engine.is_initialized:
         engine.cleanup()
 
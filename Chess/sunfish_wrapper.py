@@ -273,21 +273,25 @@ class SunfishWrapper:
                 legal_moves = list(board.legal_moves)
                 self._generate_analysis(board, legal_moves)
 
-            # Convert thinking lines to the expected format
+            # Convert thinking lines to the expected format. Every line starts
+            # from the current position and parse_san does not modify the board,
+            # so a single copy serves all of them.
+            temp_board = board.copy(stack=False)
             result = []
             for line in self.thinking_lines[:num_moves]:
-                parts = line.split(': ')
+                parts = line.split(': ', 1)
                 if len(parts) == 2:
                     move_san, eval_str = parts
+                    # Drop a trailing annotation such as the search time
+                    eval_str = eval_str.partition(' (')[0]
                     # Convert SAN to UCI
                     try:
-                        temp_board = chess.Board(board.fen())
                         move = temp_board.parse_san(move_san)
                         move_uci = move.uci()
 
                         # Parse evaluation
-                        if 'Mate in' in eval_str:
-                            mate_value = int(eval_str.split('Mate in ')[1])
+                        if eval_str.startswith('Mate in '):
+                            mate_value = int(eval_str[8:])
                             result.append({'Move': move_uci, 'Mate': mate_value})
                         else:
                             try:
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the helper functions.
+Tests the board utilities in chess_ai.utils.helpers.
+"""
+
+import unittest
+import chess
+import sys
+import os
+
+# Add the parent directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chess_ai.utils.helpers import get_square_from_pos, make_random_move, check_game_over, GameResult
+
+class TestHelpers(unittest.TestCase):
+    """Test cases for the helper functions."""
+
+    def test_get_square_from_pos(self):
+        """Test mapping pixel positions to squares, including the board edges."""
+        # 80 pixel board with 10 pixel squares, offset by (5, 5)
+        self.assertEqual(get_square_from_pos((5, 5), 5, 5, 80), chess.A8)
+        self.assertEqual(get_square_from_pos((84, 84), 5, 5, 80), chess.H1)
+        self.assertEqual(get_square_from_pos((44, 76), 5, 5, 80), chess.D1)
+
+        self.assertIsNone(get_square_from_pos((4, 40), 5, 5, 80))
+        self.assertIsNone(get_square_from_pos((85, 40), 5, 5, 80))
+        self.assertIsNone(get_square_from_pos((40, 85), 5, 5, 80))
+
+    def test_make_random_move(self):
+        """Test that a random legal move is made, or None when there is none."""
+        board = chess.Board()
+        move = make_random_move(board)
+        self.assertEqual(board.peek(), move)
+        self.assertEqual(len(board.move_stack), 1)
+
+        # Stalemate: black has no legal moves
+        board = chess.Board("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+        self.assertIsNone(make_random_move(board))
+        self.assertEqual(len(board.move_stack), 0)
+
+    def test_check_game_over(self):
+        """Test the reported result for checkmates, a stalemate and a game in progress."""
+        # Fool's mate: black wins
+        board = chess.Board("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+        self.assertEqual(check_game_over(board), (True, GameResult.BLACK_WIN))
+
+        board = chess.Board("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1")
+        self.assertEqual(check_game_over(board), (True, GameResult.WHITE_WIN))
+
+        board = chess.Board("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+        self.assertEqual(check_game_over(board), (True, GameResult.DRAW))
+
+        self.assertEqual(check_game_over(chess.Board()), (False, None))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -49,6 +49,9 @@ class TestMainApp(unittest.TestCase):
         self.original_board = main.board
         main.board = main.chess.Board()
 
+        # Forget searches made with other engines
+        main.search_cache.clear()
+
     def tearDown(self):
         """Clean up after tests."""
         # Restore the original engine and board
@@ -65,20 +68,51 @@ class TestMainApp(unittest.TestCase):
         square = main.get_square_from_pos((0, 0))
         self.assertIsNone(square)
 
-    def test_make_ai_move(self):
-        """Test the AI move function."""
+    def test_ai_move(self):
+        """Test the AI move functions."""
         # Make sure the board is in the initial position
         main.board = main.chess.Board()
 
-        # Call the function
-        main.make_ai_move()
+        # Start the search and play its move once it is done
+        main.start_ai_move()
+        main.ai_future.result()
+        self.assertTrue(main.finish_ai_move())
 
-        # Check that the engine's get_best_move was called
-        self.mock_engine.get_best_move.assert_called_with(main.board)
+        # Check that the engine searched the initial position
+        searched_board = self.mock_engine.get_best_move.call_args[0][0]
+        self.assertEqual(searched_board.fen(), main.chess.STARTING_FEN)
 
         # Check that a move was made on the board
         self.assertEqual(main.board.fen().split()[0], "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR")
 
+    def test_ai_move_reuses_search(self):
+        """Test that a position searched before is played without searching again."""
+        main.start_ai_move()
+        main.ai_future.result()
+        main.finish_ai_move()
+
+        main.board = main.chess.Board()
+        self.mock_engine.thinking_lines = []
+        main.start_ai_move()
+
+        # The cached move is played right away, with the first search's analysis
+        self.assertIsNone(main.ai_future)
+        self.mock_engine.get_best_move.assert_called_once()
+        self.assertEqual(main.board.fen().split()[0], "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR")
+        self.assertEqual(self.mock_engine.thinking_lines, ["e4: 0.00"])
+
+    def test_discard_ai_move(self):
+        """Test that a discarded search has finished and its move is not played."""
+        main.start_ai_move()
+        future = main.ai_future
+
+        main.discard_ai_move()
+
+        self.assertTrue(future.done())
+        self.assertIsNone(main.ai_future)
+        self.assertFalse(main.finish_ai_move())
+        self.assertEqual(main.board.fen(), main.chess.STARTING_FEN)
+
     def test_make_random_move(self):
         """Test the random move function."""
         # Make sure the board is in the initial position
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the search algorithm.
+Tests the core functionality of the SearchAlgorithm class.
+"""
+
+import unittest
+import chess
+import sys
+import os
+import time
+
+# Add the parent directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chess_ai.engine.search import SearchAlgorithm
+from chess_ai.engine.transposition_table import TranspositionTable
+
+PIECE_VALUES = {
+    chess.PAWN: 1.0,
+    chess.KNIGHT: 3.0,
+    chess.BISHOP: 3.0,
+    chess.ROOK: 5.0,
+    chess.QUEEN: 9.0,
+    chess.KING: 0.0
+}
+
+def material_evaluator(board):
+    """Simple material evaluation from white's perspective, in pawns."""
+    score = 0.0
+    for piece_type, value in PIECE_VALUES.items():
+        score += value * len(board.pieces(piece_type, chess.WHITE))
+        score -= value * len(board.pieces(piece_type, chess.BLACK))
+    return score
+
+class TestSearchAlgorithm(unittest.TestCase):
+    """Test cases for the SearchAlgorithm class."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.search = SearchAlgorithm(
+            evaluator=material_evaluator,
+            transposition_table=TranspositionTable(max_size=10000),
+            max_depth=3,
+            quiescence_depth=2
+        )
+
+    def test_returns_legal_move(self):
+        """Test that the search returns a legal move from the starting position."""
+        board = chess.Board()
+        best_move, score, thinking_lines = self.search.search(board, depth=2)
+
+        self.assertIn(best_move, board.legal_moves)
+        self.assertTrue(len(thinking_lines) > 0)
+
+    def test_board_unchanged_after_search(self):
+        """Test that the search leaves the board as it found it."""
+        board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 2 3")
+        fen = board.fen()
+        self.search.search(board, depth=3)
+
+        self.assertEqual(board.fen(), fen)
+
+    def test_finds_mate_in_one(self):
+        """Test that the search finds a mate in one."""
+        # Scholar's mate: Qxf7#
+        board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 2 3")
+        best_move, score, _ = self.search.search(board, depth=2)
+
+        self.assertEqual(best_move, chess.Move.from_uci("f3f7"))
+        self.assertGreater(score, 1000)
+        self.assertLess(score, float('inf'))
+
+    def test_check_extension_finds_mate_in_two(self):
+        """Test that checking moves are extended so a mate in two is seen at depth 2."""
+        # Rg7+ followed by Rh8#
+        board = chess.Board("6R1/2k5/7R/8/8/4K3/8/8 w - - 0 1")
+        best_move, score, _ = self.search.search(board, depth=2)
+
+        self.assertEqual(best_move, chess.Move.from_uci("g8g7"))
+        self.assertGreater(score, 1000)
+
+    def test_transposed_mate_keeps_its_distance(self):
+        """Test that a mate score read back from the table at another ply is adjusted."""
+        # Rg7+ followed by Rh8#, a mate in two
+        board = chess.Board("6R1/2k5/7R/8/8/4K3/8/8 w - - 0 1")
+        cold_search = SearchAlgorithm(evaluator=material_evaluator, transposition_table=TranspositionTable(max_size=10000))
+        _, cold_score, _ = cold_search.search(board, depth=2)
+
+        # Fill the table from the position after Rg7+, then reach it again one ply deeper
+        board.push_uci("g8g7")
+        self.search.search(board, depth=4)
+        board.pop()
+        _, warm_score, _ = self.search.search(board, depth=2)
+
+        self.assertEqual(warm_score, cold_score)
+
+    def test_root_without_legal_moves(self):
+        """Test that searching a checkmated or stalemated root terminates without a move."""
+        # Fool's mate: white is checkmated
+        board = chess.Board("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+        best_move, score, _ = self.search.search(board, depth=4)
+
+        self.assertIsNone(best_move)
+        self.assertLess(score, -1000)
+
+        # Black is stalemated
+        board = chess.Board("k7/8/1Q6/8/8/8/8/7K b - - 0 1")
+        best_move, score, _ = self.search.search(board, depth=4)
+
+        self.assertIsNone(best_move)
+        self.assertEqual(score, 0)
+
+    def test_score_is_finite(self):
+        """Test that a quiet position gets a finite, modest score."""
+        board = chess.Board()
+        _, score, _ = self.search.search(board, depth=3)
+
+        self.assertLess(abs(score), 5)
+
+    def test_captures_hanging_queen(self):
+        """Test that the search wins free material."""
+        board = chess.Board("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+        best_move, score, _ = self.search.search(board, depth=2)
+
+        self.assertEqual(best_move, chess.Move.from_uci("d2d5"))
+
+    def test_repeated_search_with_warm_table(self):
+        """Test that reusing the transposition table gives the same result."""
+        board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 2 3")
+        first_move, first_score, _ = self.search.search(board, depth=3)
+        second_move, second_score, _ = self.search.search(board, depth=3)
+
+        self.assertEqual(first_move, second_move)
+        self.assertEqual(first_score, second_score)
+
+    def test_respects_time_limit(self):
+        """Test that a deep search stops soon after the time limit."""
+        board = chess.Board()
+        start = time.time()
+        best_move, _, _ = self.search.search(board, depth=20, time_limit=0.2)
+
+        self.assertLess(time.time() - start, 2.0)
+        self.assertIn(best_move, board.legal_moves)
+
+    def test_get_stats(self):
+        """Test that search statistics are reported."""
+        board = chess.Board()
+        self.search.search(board, depth=2)
+        stats = self.search.get_stats()
+
+        self.assertGreater(stats['nodes'], 0)
+        self.assertIn('cache_hit_rate', stats)
+
+if __name__ == "__main__":
+    unittest.main()
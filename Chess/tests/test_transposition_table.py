@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the transposition table.
+Tests hashing and storage in the TranspositionTable class.
+"""
+
+import unittest
+import chess
+import random
+import sys
+import os
+
+# Add the parent directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chess_ai.engine.transposition_table import TranspositionTable
+
+class TestTranspositionTable(unittest.TestCase):
+    """Test cases for the TranspositionTable class."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.tt = TranspositionTable(max_size=1000)
+
+    def test_hash_after_move_matches_full_hash(self):
+        """Test that incremental hash updates agree with hashing from scratch."""
+        rng = random.Random(7)
+        for _ in range(20):
+            board = chess.Board()
+            board_hash = self.tt.compute_hash(board)
+            for _ in range(100):
+                moves = list(board.legal_moves)
+                if not moves:
+                    break
+                move = rng.choice(moves)
+                new_hash = self.tt.hash_after_move(board_hash, board, move)
+                board.push(move)
+                full_hash = self.tt.compute_hash(board)
+                if new_hash is not None:
+                    self.assertEqual(new_hash, full_hash, board.fen())
+                board_hash = full_hash
+
+    def test_hash_after_special_moves(self):
+        """Test incremental hashing of en passant, promotion and null moves."""
+        for fen, uci in [
+            ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6"),
+            ("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1", "e2e4"),
+            ("1n2k3/P7/8/8/8/8/8/4K3 w - - 0 1", "a7b8q"),
+            ("4k3/8/8/8/4p3/8/8/4K3 b - e3 0 1", "0000"),
+        ]:
+            board = chess.Board(fen)
+            move = chess.Move.from_uci(uci)
+            new_hash = self.tt.hash_after_move(self.tt.compute_hash(board), board, move)
+            board.push(move)
+            self.assertEqual(new_hash, self.tt.compute_hash(board), uci)
+
+    def test_put_and_get(self):
+        """Test that stored entries are found and respect the requested depth."""
+        board = chess.Board()
+        self.tt.put(board, {'score': 10}, 3)
+
+        hit, entry = self.tt.get(board, depth=2)
+        self.assertTrue(hit)
+        self.assertEqual(entry[1], {'score': 10})
+
+        hit, _ = self.tt.get(board, depth=4)
+        self.assertFalse(hit)
+
+    def test_older_generation_is_replaced(self):
+        """Test that deeper entries only resist replacement during their own search."""
+        key = 12345
+        other_key = key + self.tt.num_slots  # Same slot, different position
+        self.tt.put_by_key(key, 'deep', 5)
+
+        self.tt.put_by_key(other_key, 'shallow', 1)
+        self.assertTrue(self.tt.get_by_key(key)[0])
+
+        self.tt.new_search()
+        self.tt.put_by_key(other_key, 'shallow', 1)
+        self.assertFalse(self.tt.get_by_key(key)[0])
+        self.assertEqual(self.tt.get_by_key(other_key)[1][1], 'shallow')
+
+if __name__ == "__main__":
+    unittest.main()